@@ -0,0 +1,64 @@
+# Файл: benchmarks/bench_ai_client.py
+# Сравнивает настройку клиента Gemini на каждый запрос с реестром gemini_clients.
+# Вместо сети используется локальная заглушка модели; настоящий конструктор
+# GenerativeModel (он не ходит в сеть) вызывается, чтобы стоимость подготовки была честной.
+# Запуск из корня проекта: python -m benchmarks.bench_ai_client
+import asyncio, os, time, json
+import google.generativeai as genai
+from core.ai_generator import GeminiClientRegistry, MODEL_NAME, PROMPT_TEMPLATE
+
+REQUESTS_PER_LOOP = 200
+LOOPS = 5
+STUB_RESPONSE = json.dumps({"image_query": "stub", "examples": [{"original": "<b>stub</b>", "translation": "заглушка"}]})
+
+
+class StubResponse:
+    text = STUB_RESPONSE
+
+
+class StubModel:
+    def __init__(self):
+        self._real = genai.GenerativeModel(MODEL_NAME)
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(0)
+        return StubResponse()
+
+
+async def per_call_setup(prompt):
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    model = StubModel()
+    return (await model.generate_content_async(prompt)).text
+
+
+async def registry_setup(registry, prompt):
+    model = registry.get_model()
+    return (await model.generate_content_async(prompt)).text
+
+
+def run(label, make_coro):
+    start = time.perf_counter()
+    for _ in range(LOOPS):
+        # Как в CreationScreen.run_enrichment: отдельный loop на каждый запуск
+        loop = asyncio.new_event_loop()
+        try:
+            for _ in range(REQUESTS_PER_LOOP): loop.run_until_complete(make_coro(loop))
+        finally:
+            loop.close()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1e6 / (LOOPS * REQUESTS_PER_LOOP):9.1f} мкс/запрос")
+    return elapsed
+
+
+def main():
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+    prompt = PROMPT_TEMPLATE.format(keyword="casa", language="Portuguese", target_language="Russian")
+    registry = GeminiClientRegistry(factory=StubModel)
+    old = run("клиент на каждый запрос", lambda loop: per_call_setup(prompt))
+    new = run("реестр по event loop", lambda loop: registry_setup(registry, prompt))
+    print(f"Моделей создано реестром: {registry._models.created} (loop: {LOOPS})")
+    print(f"Ускорение: x{old / new:.2f}")
+
+
+if __name__ == '__main__':
+    main()
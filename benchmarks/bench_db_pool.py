@@ -0,0 +1,51 @@
+# Файл: benchmarks/bench_db_pool.py
+# Сравнивает старую схему "новое соединение на каждый вызов" с пулом соединений
+# на колоде из 50 000 карточек.
+# Запуск из корня проекта: python -m benchmarks.bench_db_pool
+import os, sqlite3, tempfile, time
+from datetime import datetime, timezone
+from core.database import DatabaseManager
+
+N_CARDS = 50_000
+ITERATIONS = 500
+
+
+def fill_deck(db: DatabaseManager, n_cards: int) -> int:
+    deck_id = db.create_deck("Benchmark", "en")
+    def insert(conn):
+        conn.executemany("INSERT INTO concepts (id, deck_id, keyword, translation) VALUES (?, ?, ?, ?)", ((i, deck_id, f"word {i}", f"слово {i}") for i in range(1, n_cards + 1)))
+        conn.executemany("INSERT INTO cards (concept_id, deck_id, card_type, due_date) VALUES (?, ?, ?, ?)",
+                         ((i, deck_id, "direct_recognition", '2000-01-01') for i in range(1, n_cards + 1)))
+    db._pool.write(insert)
+    return deck_id
+
+
+def per_call_connect(db_name: str, deck_id: int):
+    now_utc = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    conn = sqlite3.connect(db_name, check_same_thread=False); conn.row_factory = sqlite3.Row
+    try: return conn.execute("SELECT COUNT(id) FROM cards WHERE deck_id = ? AND due_date <= ?", (deck_id, now_utc)).fetchone()[0]
+    finally: conn.close()
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS): fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000 / ITERATIONS:8.3f} мс/вызов")
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, "bench.db")
+        db = DatabaseManager(db_name)
+        deck_id = fill_deck(db, N_CARDS)
+        print(f"Колода: {N_CARDS} карточек, {ITERATIONS} итераций")
+        old = timed("connect на каждый вызов", lambda: per_call_connect(db_name, deck_id))
+        new = timed("пул соединений", lambda: db.count_cards_for_review(deck_id))
+        print(f"Ускорение: x{old / new:.2f}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# Файл: benchmarks/bench_forecast.py
+# Время прогноза нагрузки на 30 дней для колоды из 100 000 и 500 000 карточек:
+# перевод строк get_srs_state в массивы и сама симуляция. Затем forecast_reviews
+# целиком - чтение из настоящей БД на 100 000 карточек, массивы и симуляция -
+# с runs=1 и runs=5 (как на экране статистики).
+# Запуск из корня проекта: python -m benchmarks.bench_forecast
+import os, tempfile, time
+from datetime import datetime, timezone
+import numpy as np
+from core.database import DatabaseManager
+from core.forecast import forecast_reviews, simulate, state_arrays
+
+SIZES = (100_000, 500_000)
+DB_CARDS = 100_000
+DAYS = 30
+REPEATS = 5
+
+
+def fake_rows(n_cards: int, today: np.datetime64) -> list[tuple]:
+    rng = np.random.default_rng(0)
+    due = (today + rng.integers(-10, 60, n_cards).astype('timedelta64[D]')).astype(str)
+    return list(zip(rng.integers(0, 8, n_cards).tolist(), rng.uniform(1, 90, n_cards).tolist(),
+                    rng.uniform(1.3, 3.0, n_cards).tolist(), due.tolist()))
+
+
+def fill_db(db: DatabaseManager, n_cards: int):
+    today = np.datetime64(datetime.now(timezone.utc).date(), 'D')
+    rows = fake_rows(n_cards, today)
+    deck_id = db.create_deck("Benchmark", "pt")
+    def insert(conn):
+        conn.executemany("INSERT INTO concepts (id, deck_id, keyword, translation) VALUES (?, ?, ?, ?)",
+                         ((i, deck_id, f"word {i}", f"слово {i}") for i in range(1, n_cards + 1)))
+        conn.executemany("INSERT INTO cards (concept_id, deck_id, card_type, repetitions, interval, ease_factor, due_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         ((i, deck_id, 'direct_recognition', reps, interval, ease, f"{due}T00:00:00Z") for i, (reps, interval, ease, due) in enumerate(rows, 1)))
+    db._pool.write(insert)
+
+
+def bench_end_to_end():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        fill_db(db, DB_CARDS)
+        for runs in (1, 5):
+            timings = []
+            for _ in range(REPEATS):
+                start = time.perf_counter(); forecast_reviews(db, days=DAYS, runs=runs, seed=1); timings.append(time.perf_counter() - start)
+            start = time.perf_counter(); db.get_srs_state(); read_s = time.perf_counter() - start
+            print(f"forecast_reviews по БД на {DB_CARDS:,} карточек, runs={runs}: лучшее {min(timings):6.3f} с, "
+                  f"медиана {sorted(timings)[REPEATS // 2]:6.3f} с (из них чтение get_srs_state ~{read_s:.3f} с)")
+        db.close()
+
+
+def main():
+    today = np.datetime64('2025-08-01')
+    for n_cards in SIZES:
+        rows = fake_rows(n_cards, today)
+        start = time.perf_counter(); state = state_arrays(rows); load_s = time.perf_counter() - start
+        start = time.perf_counter(); counts = simulate(state, DAYS, seed=1, today=today); sim_s = time.perf_counter() - start
+        print(f"{n_cards:>8,} карточек: массивы {load_s:6.3f} с, симуляция {DAYS} дней {sim_s:6.3f} с, "
+              f"всего {load_s + sim_s:6.3f} с; повторений за период {int(counts.sum()):,}")
+    bench_end_to_end()
+
+
+if __name__ == '__main__':
+    main()
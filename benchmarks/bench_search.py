@@ -0,0 +1,83 @@
+# Файл: benchmarks/bench_search.py
+# Задержка DatabaseManager.search на колоде из ~500 000 карточек (по 3 на концепт):
+# короткие и длинные префиксы, целые слова, поиск по переводу, с фильтром колоды и без.
+# Индекс наполняется триггерами при вставке, как в приложении. У частых слов в каждой
+# группе выдачи (слово целиком, совпадение в слове, в переводе/предложении) ранжируются
+# только SEARCH_RANK_CANDIDATES самых новых совпадений - это и держит задержку низкой;
+# бенчмарк проверяет, что концепт с самым частым словом целиком все равно первый.
+# В конце - сохранение пачки через create_concepts_bulk с нечеткой проверкой дубликатов.
+# Запуск из корня проекта: python -m benchmarks.bench_search
+import itertools, os, random, statistics, tempfile, time
+from core.database import DatabaseManager, normalize_phrase
+
+N_CONCEPTS = 170_000
+REPEATS = 50
+# Словарь из 30 000 искусственных слов с частотами по закону Ципфа, как в живом языке
+CONSONANTS, VOWELS = 'bcdfgjlmnprstvxz', 'aeiou'
+VOCABULARY_SIZE = 30_000
+
+
+def make_vocabulary(rnd: random.Random) -> tuple[list[str], list[float]]:
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rnd.choice(CONSONANTS) + rnd.choice(VOWELS) for _ in range(rnd.randint(1, 4))))
+    # Накопленные веса: rnd.choices с cum_weights не пересчитывает их на каждое слово
+    return sorted(words, key=lambda w: rnd.random()), list(itertools.accumulate(1 / rank for rank in range(1, VOCABULARY_SIZE + 1)))
+
+
+def word(rnd: random.Random) -> str:
+    return rnd.choices(VOCABULARY, cum_weights=CUM_WEIGHTS)[0]
+
+
+def fill(db: DatabaseManager, deck_id: int, rnd: random.Random):
+    def insert(conn):
+        concepts, cards = [], []
+        for i in range(1, N_CONCEPTS + 1):
+            phrase = ' '.join(word(rnd) for _ in range(rnd.randint(1, 5)))
+            translation = ' '.join(word(rnd) for _ in range(rnd.randint(1, 3)))
+            concepts.append((i, deck_id, phrase, normalize_phrase(phrase), translation, phrase))
+            cards.append((i, deck_id, 'direct_recognition', None))
+            cards.append((i, deck_id, 'reverse_recall', None))
+            cards.append((i, deck_id, 'context_cloze', phrase.split()[0]))
+        conn.executemany("INSERT INTO concepts (id, deck_id, keyword, norm_keyword, translation, full_sentence) VALUES (?, ?, ?, ?, ?, ?)", concepts)
+        conn.executemany("INSERT INTO cards (concept_id, deck_id, card_type, payload) VALUES (?, ?, ?, ?)", cards)
+    db._pool.write(insert)
+
+
+def timed(db, query, deck_id=None):
+    timings, found = [], 0
+    for _ in range(REPEATS):
+        start = time.perf_counter(); found = len(db.search(query, deck_id=deck_id, limit=20))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{query!r:<16} колода={deck_id!s:<5} найдено {found:>2}  медиана {statistics.median(timings):6.2f} мс  p95 {timings[int(REPEATS * 0.95) - 1]:6.2f} мс")
+
+
+def main():
+    global VOCABULARY, CUM_WEIGHTS
+    rnd = random.Random(1)
+    VOCABULARY, CUM_WEIGHTS = make_vocabulary(rnd)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        deck_id = db.create_deck("Benchmark", "pt"); other = db.create_deck("Other", "pt")
+        start = time.perf_counter(); fill(db, deck_id, rnd)
+        print(f"{N_CONCEPTS:,} концептов / {N_CONCEPTS * 3:,} карточек вставлено с индексом за {time.perf_counter() - start:.1f} с")
+        # Самое частое слово словаря и его префиксы - худший случай для поиска
+        top = VOCABULARY[0]
+        for query in (top[:2], top[:3], top, f"{VOCABULARY[5]} {VOCABULARY[50][:2]}", VOCABULARY[5000], 'qqq'):
+            timed(db, query)
+        timed(db, top[:3], deck_id); timed(db, top[:3], other)
+        # Самый старый концепт из одного частого слова должен опередить тысячи более новых совпадений
+        hits = db.search(top, limit=20)
+        print(f"{top!r}: первым найден {hits[0]['keyword']!r} (точное совпадение слова: {normalize_phrase(hits[0]['keyword']) == top})")
+        # Сохранение пачки с проверкой дубликатов: самые частые слова по отдельности и в регистре/пунктуации
+        # уже сохраненных фраз - худший случай для нечеткой проверки
+        items = [{'keyword': f"{VOCABULARY[i].title()}!", 'translation': '-'} for i in range(100)] + \
+                [{'keyword': ' '.join(word(rnd) for _ in range(3)), 'translation': '-'} for _ in range(400)]
+        start = time.perf_counter(); statuses = db.create_concepts_bulk(deck_id, items)
+        print(f"Пачка из {len(items)} фраз сохранена за {(time.perf_counter() - start) * 1000:.1f} мс, дубликатов {statuses.count('duplicate')}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
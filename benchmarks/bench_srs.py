@@ -0,0 +1,64 @@
+# Файл: benchmarks/bench_srs.py
+# Пересчет SM-2 для 1 000 000 карточек: поштучный цикл против schedule_batch.
+# Поштучный вариант - прежняя чистая функция (словарь оценок и datetime.now на
+# каждый вызов); гоняем его на выборке и пересчитываем на весь объем.
+# Запуск из корня проекта: python -m benchmarks.bench_srs
+import time
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from core.srs import schedule_batch, format_due_dates, shift_due_dates
+
+N_CARDS = 1_000_000
+SCALAR_SAMPLE = 100_000
+
+
+def scalar_sm2(repetitions, interval, ease_factor, quality):
+    if quality == 'again':
+        repetitions = 0; interval = 1.0
+    else:
+        repetitions += 1
+        if repetitions == 1: interval = 1.0
+        elif repetitions == 2: interval = 6.0
+        else: interval *= ease_factor
+    ease_factor += (0.1 - (5 - {'again': 1, 'good': 3, 'easy': 5}[quality]) * (0.08 + (5 - {'again': 1, 'good': 3, 'easy': 5}[quality]) * 0.02))
+    if ease_factor < 1.3:
+        ease_factor = 1.3
+    due_date = datetime.now(timezone.utc) + timedelta(days=int(round(interval)))
+    return {'repetitions': repetitions, 'interval': interval, 'ease_factor': ease_factor, 'due_date': due_date.strftime('%Y-%m-%dT%H:%M:%SZ')}
+
+
+def main():
+    rng = np.random.default_rng(42)
+    reps = rng.integers(0, 10, N_CARDS)
+    interval = rng.uniform(1, 200, N_CARDS)
+    ease = rng.uniform(1.3, 3.0, N_CARDS)
+    quality = rng.choice(np.array(['again', 'good', 'easy']), N_CARDS)
+
+    sample = [(int(r), float(i), float(e), str(q)) for r, i, e, q in zip(reps[:SCALAR_SAMPLE], interval[:SCALAR_SAMPLE], ease[:SCALAR_SAMPLE], quality[:SCALAR_SAMPLE])]
+    start = time.perf_counter()
+    scalar = [scalar_sm2(*args) for args in sample]
+    scalar_s = (time.perf_counter() - start) * N_CARDS / SCALAR_SAMPLE
+
+    start = time.perf_counter()
+    result = schedule_batch(reps, interval, ease, quality)
+    batch_s = time.perf_counter() - start
+    start = time.perf_counter()
+    due_strings = format_due_dates(result['due_date'])
+    format_s = time.perf_counter() - start
+    start = time.perf_counter()
+    shift_due_dates(result['due_date'], 7)
+    shift_s = time.perf_counter() - start
+
+    for i in range(0, SCALAR_SAMPLE, 997):
+        assert scalar[i]['repetitions'] == result['repetitions'][i] and abs(scalar[i]['ease_factor'] - result['ease_factor'][i]) < 1e-9
+        assert scalar[i]['due_date'][:10] == due_strings[i][:10]
+
+    print(f"{N_CARDS:,} карточек")
+    print(f"Поштучно (оценка по {SCALAR_SAMPLE:,}): {scalar_s:8.3f} с")
+    print(f"schedule_batch:                  {batch_s:8.3f} с  (x{scalar_s / batch_s:.0f})")
+    print(f"  + строки для БД:               {format_s:8.3f} с")
+    print(f"shift_due_dates на 7 дней:       {shift_s:8.3f} с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# Файл: benchmarks/bench_startup.py
+# Холодный старт приложения:
+#  1) отчет python -X importtime по "import main": сколько занимает импорт, самые
+#     дорогие прямые импорты main и какие тяжелые модули грузятся уже при старте;
+#  2) время до первого кадра: main.py запускается с PHRASEWEAVER_STARTUP_PROBE=1,
+#     печатает время от начала main.py до первой смены буферов окна и закрывается;
+#     снаружи меряется полное время от запуска процесса.
+# Каждый прогон дописывается в benchmarks/startup_history.jsonl (локальный, в .gitignore)
+# и сравнивается с предыдущими, чтобы видеть, как время старта меняется от коммита к коммиту.
+# Нужны Kivy/KivyMD и дисплей. Запуск из корня проекта: python -m benchmarks.bench_startup [прогонов]
+import json, os, re, statistics, subprocess, sys, time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HISTORY = Path(__file__).resolve().parent / 'startup_history.jsonl'
+RUNS = 5
+TOP = 12
+FIRST_FRAME_TIMEOUT = 60
+# Модули, которым не место на пути к первому кадру
+HEAVY_MODULES = ['numpy', 'google.generativeai', 'gtts', 'googletrans', 'aiohttp', 'pexels_api',
+                 'kivy_garden.graph', 'PIL.Image', 'core.enrichment', 'core.ai_generator']
+# Совпадают с main.STARTUP_PROBE_ENV / STARTUP_PROBE_MARKER (main не импортируем - он создает окно)
+PROBE_ENV, PROBE_MARKER = 'PHRASEWEAVER_STARTUP_PROBE', 'STARTUP_FIRST_FRAME_MS'
+IMPORTTIME_LINE = re.compile(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)')
+
+
+def child_env(**extra) -> dict:
+    return {**os.environ, 'KIVY_NO_ARGS': '1', 'KIVY_NO_CONSOLELOG': '1', 'PYTHONDONTWRITEBYTECODE': '1', **extra}
+
+
+def import_profile() -> dict:
+    """Один прогон -X importtime: общее время, самые дорогие прямые импорты main, тяжелые модули."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=ROOT, env=child_env(),
+                          capture_output=True, text=True, timeout=FIRST_FRAME_TIMEOUT)
+    modules, direct, children = {}, [], []
+    for line in proc.stderr.splitlines():
+        if m := IMPORTTIME_LINE.match(line):
+            cumulative_us, depth, name = int(m[1]), (len(m[2]) - 1) // 2, m[3]
+            modules[name] = cumulative_us
+            # Отступ - глубина вложенности, а вложенные модули печатаются раньше родителя:
+            # прямые импорты main - строки глубины 1 перед строкой самого main
+            if depth == 1: children.append((name, cumulative_us))
+            elif depth == 0:
+                if name == 'main': direct = children
+                children = []
+    if proc.returncode != 0 or 'main' not in modules:
+        raise RuntimeError(f"import main завершился с ошибкой:\n{proc.stderr[-2000:]}")
+    return {'import_ms': modules['main'] / 1000,
+            'top': sorted(direct, key=lambda item: -item[1])[:TOP],
+            'heavy': [name for name in HEAVY_MODULES if name in modules]}
+
+
+def first_frame() -> tuple[float, float]:
+    """(мс от запуска процесса, мс от начала main.py) до первого кадра."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, 'main.py'], cwd=ROOT, env=child_env(**{PROBE_ENV: '1'}),
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        for line in proc.stdout:
+            if line.startswith(PROBE_MARKER):
+                wall_ms = (time.perf_counter() - start) * 1000
+                return wall_ms, float(line.split()[1])
+        raise RuntimeError(f"main.py завершился без отметки {PROBE_MARKER} (код {proc.wait()})")
+    finally:
+        try: proc.wait(timeout=FIRST_FRAME_TIMEOUT)
+        except subprocess.TimeoutExpired: proc.kill()
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def show_history(current: dict, limit: int = 10):
+    if not HISTORY.exists(): return
+    entries = [json.loads(line) for line in HISTORY.read_text(encoding='utf-8').splitlines() if line.strip()][-limit:]
+    print(f"\nИстория ({HISTORY.name}, последние {len(entries)}):")
+    print(f"{'дата':<20} {'коммит':<10} {'импорт':>9} {'кадр':>9} {'процесс':>9}")
+    for e in entries:
+        print(f"{e['date']:<20} {e['commit'] or '-':<10} {e['import_ms']:7.0f}мс {e['first_frame_ms']:7.0f}мс {e['process_ms']:7.0f}мс")
+    if len(entries) > 1:
+        previous = entries[-2]
+        print(f"К прошлому прогону: кадр {current['first_frame_ms'] - previous['first_frame_ms']:+.0f} мс, "
+              f"импорт {current['import_ms'] - previous['import_ms']:+.0f} мс")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    profiles = [import_profile() for _ in range(runs)]
+    frames = [first_frame() for _ in range(runs)]
+
+    profile = min(profiles, key=lambda p: p['import_ms'])
+    print(f"import main (лучший из {runs}): {profile['import_ms']:.0f} мс; дороже всего:")
+    for name, cumulative_us in profile['top']:
+        print(f"  {name:<40} {cumulative_us / 1000:8.1f} мс")
+    print(f"Тяжелые модули при старте: {', '.join(profile['heavy']) or 'нет'}")
+    process_ms = statistics.median(f[0] for f in frames)
+    first_frame_ms = statistics.median(f[1] for f in frames)
+    print(f"До первого кадра (медиана из {runs}): {first_frame_ms:.0f} мс от начала main.py, {process_ms:.0f} мс от запуска процесса")
+
+    entry = {'date': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'), 'commit': git_revision(),
+             'python': sys.version.split()[0], 'runs': runs, 'import_ms': round(profile['import_ms'], 1),
+             'first_frame_ms': round(first_frame_ms, 1), 'process_ms': round(process_ms, 1), 'heavy_modules': profile['heavy']}
+    with open(HISTORY, 'a', encoding='utf-8') as f: f.write(json.dumps(entry) + '\n')
+    show_history(entry)
+
+
+if __name__ == '__main__':
+    main()
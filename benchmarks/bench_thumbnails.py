@@ -0,0 +1,67 @@
+# Файл: benchmarks/bench_thumbnails.py
+# Задержка показа картинки на карточку: полноразмерный оригинал против миниатюры.
+# На каждую "карточку" картинка декодируется заново (как при source + reload()),
+# кэш текстур не используется. Если Kivy доступен, декодирует его загрузчик
+# (kivy.core.image), иначе Pillow. Нужен Pillow - им рисуются тестовые картинки.
+# Запуск из корня проекта: python -m benchmarks.bench_thumbnails
+import os, random, statistics, tempfile, time
+from pathlib import Path
+from PIL import Image, ImageDraw
+import core.thumbnails as thumbnails
+
+N_IMAGES = 20
+ORIGINAL_SIZE = (2400, 1600)  # типичная фотография с Pexels
+
+
+def make_photo(path: str, seed: int):
+    rnd = random.Random(seed)
+    img = Image.new('RGB', ORIGINAL_SIZE, tuple(rnd.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(300):
+        x, y = rnd.randrange(ORIGINAL_SIZE[0]), rnd.randrange(ORIGINAL_SIZE[1])
+        draw.ellipse((x, y, x + rnd.randrange(20, 400), y + rnd.randrange(20, 400)), fill=tuple(rnd.randrange(256) for _ in range(3)))
+    img.save(path, 'JPEG', quality=90)
+
+
+def decoder():
+    try:
+        from kivy.core.image import Image as CoreImage
+        return 'kivy', lambda path: CoreImage(path, nocache=True).texture
+    except Exception:
+        return 'Pillow', lambda path: Image.open(path).convert('RGB')
+
+
+def per_card_ms(load, paths) -> list[float]:
+    timings = []
+    for path in paths:
+        start = time.perf_counter(); load(path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<12} медиана {statistics.median(timings):8.2f} мс   p95 {p95:8.2f} мс")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        thumbnails.THUMB_DIR = Path(tmp) / 'thumbs'  # не трогаем assets/images/thumbs
+        originals = [os.path.join(tmp, f"{i:064x}.jpg") for i in range(N_IMAGES)]
+        for i, path in enumerate(originals): make_photo(path, i)
+
+        start = time.perf_counter()
+        thumbs = [thumbnails.make_thumbnail(path) for path in originals]
+        build_ms = (time.perf_counter() - start) * 1000 / N_IMAGES
+
+        name, load = decoder()
+        print(f"{N_IMAGES} картинок {ORIGINAL_SIZE[0]}x{ORIGINAL_SIZE[1]}, декодер: {name}")
+        print(f"Создание миниатюры (в фоне, один раз): {build_ms:.2f} мс/картинка, "
+              f"размер {os.path.getsize(originals[0]) // 1024} КБ -> {os.path.getsize(thumbs[0]) // 1024} КБ")
+        report("оригинал", per_card_ms(load, originals))
+        report("миниатюра", per_card_ms(load, thumbs))
+
+
+if __name__ == '__main__':
+    main()
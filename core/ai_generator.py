@@ -4,6 +4,17 @@ import os
 import google.generativeai as genai
 import logging
 import json
+import asyncio
+import threading
+from core.cache import PersistentCache
+from core.loop_local import LoopLocal
+from core.scheduler import scheduler
+from core.config import AI_CACHE_TTL, AI_CACHE_MAX_BYTES, AI_BATCH_SIZE
+
+MODEL_NAME = 'gemini-1.5-flash'
+
+# Ответы модели кэшируются на диске по хэшу готового промпта и имени модели
+ai_cache = PersistentCache('ai_examples', ttl=AI_CACHE_TTL, max_bytes=AI_CACHE_MAX_BYTES)
 
 # Промпт может оставаться глобальным, это просто константа
 PROMPT_TEMPLATE = """
@@ -24,40 +35,180 @@ PROMPT_TEMPLATE = """
 }}
 """
 
-async def generate_examples_with_ai(keyword: str, language: str, target_language: str) -> dict | None:
+# Пакетный вариант PROMPT_TEMPLATE: несколько слов в одном запросе
+BATCH_PROMPT_TEMPLATE = """
+Твоя задача - помочь в изучении языков. 
+Для КАЖДОГО слова или фразы из JSON-списка {keywords} на языке "{language}":
+1.  Придумай одно-два ключевых слова на английском для поиска картинки, которая лучше всего визуально ассоциируется с этим словом. Назови это поле "image_query".
+2.  Создай 5 реалистичных примеров предложений с этим словом. Используй разные грамматические формы.
+3.  Для каждого предложения предоставь точный перевод на {target_language} язык.
+4.  Критически важно: в каждом оригинальном предложении найди это слово (в любой его форме) и оберни его в HTML-теги <b> и </b>.
+Верни ответ ТОЛЬКО в виде валидного JSON-объекта, ключи которого - слова из списка ровно в том виде, в каком они даны, без каких-либо других слов или форматирования.
+Пример формата:
+{{
+  "ir": {{
+    "image_query": "walking home sunset",
+    "examples": [
+      {{"original": "Eu estou <b>indo</b> para casa.", "translation": "Я иду домой."}}
+    ]
+  }},
+  "praia": {{
+    "image_query": "beach",
+    "examples": [
+      {{"original": "Eles foram para a <b>praia</b>.", "translation": "Они пошли на пляж."}}
+    ]
+  }}
+}}
+"""
+
+class GeminiClientRegistry:
     """
-    Генерирует примеры фраз с помощью AI, создавая новый клиент для каждого вызова.
+    Настраивает genai один раз на процесс и держит по одной модели на каждый event loop.
+    Асинхронный клиент Gemini привязан к loop, в котором создан, поэтому модель
+    нельзя делить между потоками CreationScreen.run_enrichment, но и создавать
+    ее заново на каждый запрос незачем.
     """
-    
-    # logging.info(f"Отправка AI-запроса для '{keyword}'...")
 
-    
-    # --- КЛЮЧЕВОЕ АРХИТЕКТУРНОЕ ИСПРАВЛЕНИЕ ---
-    # Мы создаем и настраиваем модель ВНУТРИ функции.
-    # Это гарантирует, что для каждого асинхронного "движка" будет свой, свежий клиент.
+    def __init__(self, model_name: str = MODEL_NAME, factory=None):
+        self._configured = False
+        self._lock = threading.Lock()
+        self._models = LoopLocal(factory or (lambda: genai.GenerativeModel(model_name)))
+
+    def _configure(self):
+        with self._lock:
+            if not self._configured:
+                genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+                self._configured = True
+
+    def get_model(self):
+        """Модель для текущего event loop. KeyError, если не задан GOOGLE_API_KEY."""
+        self._configure()
+        return self._models.get()
+
+    def release(self, loop=None):
+        """Забывает модель loop; вызывается перед его закрытием."""
+        self._models.release(loop)
+
+
+gemini_clients = GeminiClientRegistry()
+
+
+def _prompt_and_key(keyword: str, language: str, target_language: str) -> tuple[str, str]:
+    prompt = PROMPT_TEMPLATE.format(keyword=keyword, language=language, target_language=target_language)
+    return prompt, PersistentCache.make_key(MODEL_NAME, prompt)
+
+
+def _get_model():
+    # Для каждого асинхронного "движка" (event loop) - свой клиент,
+    # но внутри одного loop он переиспользуется между запросами.
     try:
-        api_key = os.environ["GOOGLE_API_KEY"]
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        return gemini_clients.get_model()
     except KeyError:
         logging.error("КРИТИЧЕСКАЯ ОШИБКА: Ключ GOOGLE_API_KEY не установлен!")
-        return None
     except Exception as e:
         logging.error(f"Ошибка конфигурации Gemini API: {e}")
-        return None
-    
+    return None
+
+
+async def _ask_model(model, prompt: str):
+    """Отправляет промпт и разбирает JSON из ответа (модель любит оборачивать его в ```json)."""
+    response = await scheduler.call('gemini', lambda: model.generate_content_async(prompt))
+    raw_text = response.text.strip().replace("```json", "").replace("```", "").strip()
+    return json.loads(raw_text)
+
+
+def _is_valid_entry(data) -> bool:
+    """Проверяет, что ответ для одного слова имеет ожидаемую форму и непустые примеры."""
+    if not isinstance(data, dict) or not isinstance(data.get('examples'), list) or not data['examples']:
+        return False
+    return all(isinstance(ex, dict) and ex.get('original') and ex.get('translation') for ex in data['examples'])
+
+
+async def generate_examples_with_ai(keyword: str, language: str, target_language: str, use_cache: bool = True) -> dict | None:
+    """
+    Генерирует примеры фраз с помощью AI. Клиент модели берется из gemini_clients.
+    Повторный запрос с тем же промптом отдается из дискового кэша;
+    use_cache=False заставляет заново сходить в модель. В кэш попадают только
+    ответы ожидаемой формы (_is_valid_entry); некорректный ответ - None.
+    """
+    prompt, cache_key = _prompt_and_key(keyword, language, target_language)
+    if use_cache and (cached := ai_cache.get(cache_key)) is not None:
+        if _is_valid_entry(cached):
+            logging.info(f"AI-данные для '{keyword}' взяты из кэша.")
+            return cached
+        # Записи, сохраненные до проверки формы, считаем промахом - ответ перезапишется
+        logging.warning(f"Некорректная запись в AI-кэше для '{keyword}', запрашиваем заново.")
+
+    model = _get_model()
     if not model:
         return None
 
-    prompt = PROMPT_TEMPLATE.format(keyword=keyword, language=language, target_language=target_language)
     logging.info(f"Отправка AI-запроса для '{keyword}'...")
 
     try:
-        response = await model.generate_content_async(prompt)
-        raw_text = response.text.strip().replace("```json", "").replace("```", "").strip()
-        data = json.loads(raw_text)
+        data = await _ask_model(model, prompt)
+        if not _is_valid_entry(data):
+            logging.error(f"AI вернул ответ неожиданной формы для '{keyword}', в кэш не сохраняем.")
+            return None
         logging.info(f"AI успешно сгенерировал данные для '{keyword}'.")
+        ai_cache.set(cache_key, data)
         return data
     except Exception as e:
         logging.error(f"Ошибка при работе с AI: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+async def _generate_batch_chunk(model, keywords: list[str], language: str, target_language: str) -> dict:
+    prompt = BATCH_PROMPT_TEMPLATE.format(keywords=json.dumps(keywords, ensure_ascii=False), language=language, target_language=target_language)
+    logging.info(f"Отправка пакетного AI-запроса для {len(keywords)} слов...")
+    try:
+        data = await _ask_model(model, prompt)
+    except Exception as e:
+        logging.error(f"Ошибка пакетного AI-запроса: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    # Модель может слегка изменить ключ (регистр, пробелы) - сопоставляем мягко
+    by_norm = {str(k).strip().lower(): v for k, v in data.items()}
+    return {kw: data.get(kw, by_norm.get(kw.strip().lower())) for kw in keywords}
+
+
+async def generate_examples_batch(keywords: list[str], language: str, target_language: str, use_cache: bool = True) -> dict[str, dict | None]:
+    """
+    Генерирует примеры сразу для списка слов: по AI_BATCH_SIZE слов в одном промпте.
+    Возвращает {keyword: данные как у generate_examples_with_ai или None}.
+    Каждая запись проверяется отдельно; некорректные слова перезапрашиваются
+    поодиночке. Удачные записи кладутся в кэш под ключом одиночного промпта,
+    так что последующий enrich_phrase для этих слов отвечает из кэша.
+    """
+    results, pending, retry = {}, [], []
+    for kw in dict.fromkeys(keywords):
+        _, cache_key = _prompt_and_key(kw, language, target_language)
+        if use_cache and (cached := ai_cache.get(cache_key)) is not None:
+            # Кэшированная запись проверяется так же, как свежий ответ: некорректная - поодиночке
+            if _is_valid_entry(cached): results[kw] = cached
+            else: retry.append(kw)
+        else:
+            pending.append(kw)
+    if not pending and not retry:
+        return results
+
+    model = _get_model()
+    if not model:
+        return {**results, **{kw: None for kw in pending + retry}}
+
+    chunks = [pending[i:i + AI_BATCH_SIZE] for i in range(0, len(pending), AI_BATCH_SIZE)]
+    for chunk, answers in zip(chunks, await asyncio.gather(*(_generate_batch_chunk(model, c, language, target_language) for c in chunks))):
+        for kw in chunk:
+            entry = answers.get(kw)
+            if _is_valid_entry(entry):
+                ai_cache.set(_prompt_and_key(kw, language, target_language)[1], entry)
+                results[kw] = entry
+            else:
+                retry.append(kw)
+
+    if retry:
+        logging.warning(f"Некорректные данные (пакетный ответ или запись кэша) для {len(retry)} слов, запрашиваем их по одному.")
+        retried = await asyncio.gather(*(generate_examples_with_ai(kw, language, target_language, use_cache=False) for kw in retry))
+        results.update(zip(retry, retried))
+    return results
@@ -0,0 +1,167 @@
+# Файл: core/audio_store.py
+import asyncio, logging, os, tempfile, threading
+from concurrent.futures import Future, wait
+from pathlib import Path
+from core.cache import PersistentCache
+from core.scheduler import scheduler
+from core.config import AUDIO_DIR, AUDIO_MAX_PARALLEL, AUDIO_DRAIN_TIMEOUT, AUDIO_BACKFILL_LIMIT
+
+# Региональный вариант произношения gTTS для языков, где он важен
+TLD_MAP = {'pt': 'pt'}
+
+
+class AudioStore:
+    """
+    Озвучка с адресацией по содержимому: файл называется полным SHA-256 от
+    (text, lang, tld, slow), поэтому одна и та же фраза синтезируется один раз,
+    где бы она ни встретилась (слово, пример, cloze). Индекс "ключ -> файл"
+    лежит в SQLite-кэше (namespace 'audio_index').
+    """
+
+    def __init__(self, root: Path = AUDIO_DIR):
+        self.root = Path(root)
+        self.index = PersistentCache('audio_index')
+
+    @staticmethod
+    def voice(lang: str, slow: bool = False) -> dict:
+        return {'lang': lang, 'tld': TLD_MAP.get(lang, 'com'), 'slow': slow}
+
+    def key_for(self, text: str, lang: str, slow: bool = False) -> str:
+        v = self.voice(lang, slow)
+        return PersistentCache.make_key(text, v['lang'], v['tld'], v['slow'])
+
+    def lookup(self, text: str, lang: str, slow: bool = False) -> str | None:
+        """Путь к готовому файлу или None. Не ходит в сеть, можно звать из UI."""
+        key = self.key_for(text, lang, slow)
+        entry = self.index.get(key)
+        if entry and Path(entry['path']).exists(): return entry['path']
+        # Файл мог остаться от прошлого запуска без записи в индексе
+        path = self.root / f"{key}.mp3"
+        if path.exists():
+            self.index.set(key, {'path': str(path), 'text': text, **self.voice(lang, slow)})
+            return str(path)
+        return None
+
+    async def synthesize(self, text: str, lang: str, slow: bool = False) -> str:
+        """Возвращает путь к озвучке, при необходимости синтезирует ее через gTTS."""
+        if path := self.lookup(text, lang, slow): return path
+        from gtts import gTTS  # тяжелый импорт (requests, bs4) - только при первом синтезе
+        key, v = self.key_for(text, lang, slow), self.voice(lang, slow)
+        path = self.root / f"{key}.mp3"
+        loop = asyncio.get_running_loop()
+        tts = await loop.run_in_executor(None, lambda: gTTS(text=text, lang=v['lang'], tld=v['tld'], slow=v['slow']))
+        # Сетевой запрос к Google TTS происходит именно в save(); пишем во временный файл,
+        # чтобы оборванная загрузка не оставила битый mp3 под "правильным" именем
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix='.part'); os.close(fd)
+        try:
+            await scheduler.call('tts', lambda: loop.run_in_executor(None, tts.save, tmp_name))
+            os.replace(tmp_name, path)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+        self.index.set(key, {'path': str(path), 'text': text, **v})
+        logging.info(f"Аудио '{text}' ({v['lang']} / {v['tld']}) сохранено: {path}")
+        return str(path)
+
+
+audio_store = AudioStore()
+
+
+class AudioJobQueue:
+    """
+    Фоновая очередь синтеза: свой event loop в отдельном потоке и не больше
+    max_parallel одновременных синтезов. submit() возвращает concurrent.futures.Future,
+    так что результат можно ждать из любого потока или повесить callback.
+    Одинаковые фразы, уже стоящие в очереди, не синтезируются повторно.
+    """
+
+    def __init__(self, store: AudioStore = audio_store, max_parallel: int = AUDIO_MAX_PARALLEL):
+        self.store = store
+        self.max_parallel = max_parallel
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run_loop, name='audio-jobs', daemon=True)
+                self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_parallel)
+        self._loop.run_forever()
+
+    async def _job(self, text: str, lang: str, slow: bool) -> str | None:
+        async with self._semaphore:
+            try: return await self.store.synthesize(text, lang, slow)
+            except Exception as e: logging.error(f"Ошибка генерации аудио для '{text}': {e}"); return None
+
+    def submit(self, text: str, lang: str, slow: bool = False, callback=None) -> Future:
+        """
+        Ставит фразу в очередь синтеза. callback(path) вызывается в потоке очереди
+        (или сразу, если такая задача уже завершилась), path - None, если синтез не удался.
+        """
+        key = self.store.key_for(text, lang, slow)
+        self._ensure_started()
+        with self._lock:
+            future = self._pending.get(key)
+            created = future is None
+            if created:
+                future = asyncio.run_coroutine_threadsafe(self._job(text, lang, slow), self._loop)
+                self._pending[key] = future
+        # Вне блокировки: у уже завершенной задачи callback вызывается сразу, в этом же потоке
+        if created: future.add_done_callback(lambda f, k=key: self._forget(k))
+        if callback:
+            future.add_done_callback(lambda f: callback(None if f.cancelled() or f.exception() else f.result()))
+        return future
+
+    def _forget(self, key: str):
+        with self._lock: self._pending.pop(key, None)
+
+    def pending(self) -> int:
+        with self._lock: return len(self._pending)
+
+    @staticmethod
+    async def _cancel_all():
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self, timeout: float = AUDIO_DRAIN_TIMEOUT):
+        """
+        Останавливает loop очереди. Сначала до timeout секунд ждет, пока синтез
+        доделается (его callback успеет записать путь в БД), остальное отменяется -
+        такие концепты подхватит backfill_missing_audio при следующем запуске.
+        """
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+            pending = list(self._pending.values())
+        if loop is None: return
+        if pending:
+            done, not_done = wait(pending, timeout=timeout)
+            if not_done: logging.warning(f"Очередь озвучки остановлена, не доделано задач: {len(not_done)}")
+        # Отменяем внутри loop и дожидаемся отмены, чтобы задачи не остались висеть в закрытом loop
+        asyncio.run_coroutine_threadsafe(self._cancel_all(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+audio_jobs = AudioJobQueue()
+
+
+def backfill_missing_audio(db_manager, limit: int = AUDIO_BACKFILL_LIMIT) -> int:
+    """
+    Ставит в очередь синтеза концепты без озвучки - например, сохраненные прямо
+    перед выходом, когда очередь не успела их доделать. Возвращает число задач.
+    """
+    concepts = db_manager.get_concepts_without_audio(limit)
+    for concept in concepts:
+        audio_jobs.submit(concept['keyword'], concept['lang_code'],
+                          callback=lambda path, c_id=concept['id']: path and db_manager.set_concept_audio(c_id, path))
+    if concepts: logging.info(f"Озвучка поставлена в очередь для концептов без нее: {len(concepts)}")
+    return len(concepts)
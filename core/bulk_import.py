@@ -0,0 +1,130 @@
+# Файл: core/bulk_import.py
+import asyncio, csv, json, logging, re, time
+from pathlib import Path
+from core.ai_generator import generate_examples_batch
+from core.enrichment import enrich_phrase, generate_audio, get_translations, language_name
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - IMPORT - %(levelname)s - %(message)s')
+
+
+def read_import_file(path: str | Path) -> list[tuple[str, str]]:
+    """
+    Читает список для импорта: [(keyword, full_sentence), ...].
+    TXT - одно слово или предложение на строку.
+    CSV - колонки keyword[,sentence]; строка-заголовок "keyword,..." пропускается.
+    """
+    path = Path(path)
+    rows = []
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if path.suffix.lower() == '.csv':
+            for i, record in enumerate(csv.reader(f)):
+                if not record or not record[0].strip(): continue
+                if i == 0 and record[0].strip().lower() == 'keyword': continue
+                rows.append((record[0].strip(), record[1].strip() if len(record) > 1 else ''))
+        else:
+            rows = [(line.strip(), '') for line in f if line.strip()]
+    return rows
+
+
+class Checkpoint:
+    """Номера строк входного файла, уже записанных в БД. Хранится в JSON рядом с файлом импорта."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.done = set()
+        if self.path.exists():
+            try: self.done = set(json.loads(self.path.read_text(encoding='utf-8')).get('done', []))
+            except (OSError, ValueError) as e: logging.error(f"Не удалось прочитать чекпоинт {self.path}: {e}")
+
+    def save(self):
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps({'done': sorted(self.done)}), encoding='utf-8')
+        tmp.replace(self.path)
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
+
+
+class BulkImporter:
+    """
+    Безголовый импорт списка слов: enrich_phrase по всем строкам с ограниченной
+    параллельностью и запись результатов в БД пачками через create_concepts_bulk.
+    Перед обогащением очередного окна строк AI-кэш и кэш переводов прогреваются
+    пакетными запросами (generate_examples_batch, get_translations), поэтому
+    enrich_phrase берет примеры и переводы из кэша.
+    """
+
+    def __init__(self, db_manager, deck_id: int, lang_code: str, target_lang: str, concurrency: int = 4,
+                 batch_size: int = 50, max_examples: int = 3, with_audio: bool = True, checkpoint: Checkpoint | None = None):
+        self.db_manager = db_manager
+        self.deck_id = deck_id
+        self.lang_code = lang_code
+        self.target_lang = target_lang
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_examples = max_examples
+        self.with_audio = with_audio
+        self.checkpoint = checkpoint
+        self.stats = {'rows': 0, 'skipped': 0, 'enriched': 0, 'failed': 0, 'saved': 0, 'duplicates': 0, 'elapsed': 0.0}
+        self._buffer, self._buffer_rows = [], []
+
+    async def run(self, rows: list[tuple[str, str]]) -> dict:
+        done = self.checkpoint.done if self.checkpoint else set()
+        pending = [(i, kw, sentence) for i, (kw, sentence) in enumerate(rows) if i not in done]
+        self.stats['rows'], self.stats['skipped'] = len(rows), len(rows) - len(pending)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        try:
+            for offset in range(0, len(pending), self.batch_size):
+                window = pending[offset:offset + self.batch_size]
+                await generate_examples_batch([kw for _, kw, _ in window], language_name(self.lang_code), language_name(self.target_lang))
+                # Переводы слов и предложений окна - тоже одним запросом, enrich_phrase возьмет их из кэша
+                await get_translations([text for _, kw, sentence in window for text in (kw, sentence) if text], self.lang_code, self.target_lang)
+                for row_index, items in await asyncio.gather(*(self._enrich_row(semaphore, row) for row in window)):
+                    if items is None: continue
+                    self._buffer.extend(items); self._buffer_rows.append(row_index)
+                    if len(self._buffer) >= self.batch_size:
+                        await asyncio.get_running_loop().run_in_executor(None, self._flush)
+                self._report(start)
+        finally:
+            # В том числе при прерывании: все, что уже обогащено, сохраняем и отмечаем в чекпоинте
+            self._flush()
+            self.stats['elapsed'] = time.perf_counter() - start
+        return self.stats
+
+    async def _enrich_row(self, semaphore, row):
+        row_index, keyword, sentence = row
+        async with semaphore:
+            data = await enrich_phrase(keyword, sentence, self.lang_code, self.target_lang)
+            head = (sentence or keyword, data.get('full_sentence_translation') or data.get('translation')) if data else None
+            # Без перевода основной фразы create_concepts_bulk ее не сохранит; строку не отмечаем
+            # в чекпоинте, чтобы следующий запуск попробовал ее снова
+            if not data or not data.get('examples') or head[1] is None:
+                self.stats['failed'] += 1
+                return row_index, None
+            self.stats['enriched'] += 1
+            phrases = [head]
+            phrases += [(re.sub(r'</?b>', '', ex.get('original', '')), re.sub(r'</?b>', '', ex.get('translation', '')))
+                        for ex in data['examples'][:self.max_examples]]
+            items = []
+            for phrase, translation in phrases:
+                audio_path = await generate_audio(phrase, self.lang_code) if self.with_audio else None
+                items.append({'keyword': phrase, 'original_keyword': keyword, 'translation': translation,
+                              'image_path': data.get('image_path'), 'audio_path': audio_path})
+            return row_index, items
+
+    def _flush(self):
+        if not self._buffer_rows: return
+        statuses = self.db_manager.create_concepts_bulk(self.deck_id, self._buffer)
+        self.stats['saved'] += sum(1 for s in statuses if s and s != "duplicate")
+        self.stats['duplicates'] += statuses.count("duplicate")
+        if self.checkpoint:
+            self.checkpoint.done.update(self._buffer_rows)
+            self.checkpoint.save()
+        self._buffer, self._buffer_rows = [], []
+
+    def _report(self, start: float):
+        processed = self.stats['enriched'] + self.stats['failed']
+        elapsed = time.perf_counter() - start
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        logging.info(f"Импорт: {processed}/{self.stats['rows'] - self.stats['skipped']} строк, {rate:.2f} строк/с, сохранено {self.stats['saved']} концептов")
@@ -0,0 +1,142 @@
+# Файл: core/cache.py
+import sqlite3, json, hashlib, logging, threading, time
+from core.config import CACHE_DB_NAME
+
+# Проверяем размер кэша не на каждой записи, а раз в столько записей
+_EVICT_EVERY = 32
+
+
+class PersistentCache:
+    """
+    Постоянный кэш "ключ -> JSON-значение" в отдельном файле SQLite.
+    Записи старше ttl секунд считаются устаревшими, а при превышении max_bytes
+    вытесняются давно не использованные (LRU). Разные подсистемы делят один файл,
+    каждая в своем namespace. Флаг bypass заставляет пропускать чтение из кэша
+    (свежий результат при этом все равно записывается).
+    """
+
+    def __init__(self, namespace: str, db_name: str = CACHE_DB_NAME, ttl: float | None = None, max_bytes: int | None = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bypass = False
+        self.hits = 0
+        self.misses = 0
+        self._db_name = db_name
+        self._conn = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Стабильный ключ по содержимому: SHA-256 от JSON-представления частей."""
+        return hashlib.sha256(json.dumps(parts, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Файл открываем при первом обращении, а не при импорте модуля
+        if self._conn is None:
+            conn = sqlite3.connect(self._db_name, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS cache_entries (
+                        namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+                        size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL,
+                        PRIMARY KEY (namespace, key)
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (namespace, accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str):
+        """Возвращает сохраненное значение или None, если записи нет, она устарела или включен bypass."""
+        if self.bypass:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute("SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)).fetchone()
+                if row and self.ttl is not None and now - row[1] > self.ttl:
+                    with conn: conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                with conn: conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, self.namespace, key))
+                self.hits += 1
+                return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Ошибка чтения кэша '{self.namespace}': {e}")
+            return None
+
+    def set(self, key: str, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.execute("REPLACE INTO cache_entries (namespace, key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                                 (self.namespace, key, payload, len(payload.encode()), now, now))
+                self._writes += 1
+                if self._writes % _EVICT_EVERY == 0:
+                    self._evict(conn, now)
+        except sqlite3.Error as e:
+            logging.error(f"Ошибка записи в кэш '{self.namespace}': {e}")
+
+    def delete(self, key: str):
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn: conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+        except sqlite3.Error as e:
+            logging.error(f"Ошибка удаления из кэша '{self.namespace}': {e}")
+
+    def _evict(self, conn, now: float):
+        with conn:
+            if self.ttl is not None:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND created_at < ?", (self.namespace, now - self.ttl))
+            if self.max_bytes is not None:
+                # Оставляем самые свежие по обращению записи, пока их суммарный размер влезает в лимит
+                conn.execute("""
+                    DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                        SELECT key FROM (
+                            SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running
+                            FROM cache_entries WHERE namespace = ?
+                        ) WHERE running > ?
+                    )
+                """, (self.namespace, self.namespace, self.max_bytes))
+
+    def evict(self):
+        """Принудительно удаляет устаревшие записи и вытесняет лишние по LRU."""
+        try:
+            with self._lock: self._evict(self._connection(), time.time())
+        except sqlite3.Error as e:
+            logging.error(f"Ошибка очистки кэша '{self.namespace}': {e}")
+
+    def clear(self):
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn: conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            logging.error(f"Ошибка очистки кэша '{self.namespace}': {e}")
+
+    def stats(self) -> dict:
+        """Счетчики попаданий/промахов и текущий размер: {'hits': 3, 'misses': 1, 'entries': 4, 'bytes': 5120}."""
+        entries, size = 0, 0
+        try:
+            with self._lock:
+                entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Ошибка чтения статистики кэша '{self.namespace}': {e}")
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
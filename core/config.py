@@ -1,3 +1,8 @@
+from pathlib import Path
+
+# Каталоги для скачанных и сгенерированных медиафайлов
+AUDIO_DIR, IMAGE_DIR = Path("assets/audio"), Path("assets/images")
+
 # Список поддерживаемых языков. Ключ - код, значение - то, что увидит пользователь.
 SUPPORTED_LANGUAGES = {
     'en': 'Английский',
@@ -9,4 +14,82 @@ SUPPORTED_LANGUAGES = {
 # Здесь в будущем могут быть и другие настройки:
 # - Количество примеров по умолчанию
 # - Ключи API (если появятся)
-# - И т.д.
\ No newline at end of file
+# - И т.д.
+
+# Настройки SQLite, применяются к каждому соединению при открытии.
+# journal_mode хранится в самом файле БД и выставляется один раз соединением-писателем.
+DB_PRAGMAS = {
+    'journal_mode': 'WAL',          # читатели не блокируются писателем
+    'synchronous': 'NORMAL',        # в режиме WAL это безопасно и заметно быстрее FULL
+    'cache_size': -8000,            # отрицательное значение - размер в КиБ (~8 МБ)
+    'mmap_size': 64 * 1024 * 1024,  # 64 МБ
+}
+# Сколько операций записи из очереди объединяется в одну транзакцию
+DB_WRITE_BATCH = 64
+
+# Отдельный файл для кэшей обогащения (AI, переводы и т.д.), чтобы не смешивать их с данными пользователя
+CACHE_DB_NAME = 'phraseweaver_cache.db'
+AI_CACHE_TTL = 30 * 24 * 3600        # 30 дней
+AI_CACHE_MAX_BYTES = 20 * 1024 * 1024  # 20 МБ
+# Сколько слов упаковывается в один пакетный AI-запрос
+AI_BATCH_SIZE = 10
+
+# Ограничения внешних сервисов обогащения для core/scheduler.py:
+# rate - запросов в секунду, burst - сколько можно сразу, плюс повторы и предохранитель.
+SERVICE_LIMITS = {
+    'gemini':    {'rate': 0.25, 'burst': 3,  'max_retries': 3, 'base_delay': 2.0},  # бесплатный тариф - 15 запросов в минуту
+    'translate': {'rate': 5.0,  'burst': 5,  'max_retries': 3, 'base_delay': 1.0},
+    'pexels':    {'rate': 0.05, 'burst': 10, 'max_retries': 2, 'base_delay': 2.0},  # 200 запросов в час
+    'images':    {'rate': 10.0, 'burst': 10, 'max_retries': 2, 'base_delay': 0.5},
+    'tts':       {'rate': 2.0,  'burst': 4,  'max_retries': 3, 'base_delay': 1.0},
+}
+TRANSLATION_CACHE_TTL = 90 * 24 * 3600        # 90 дней
+TRANSLATION_CACHE_MAX_BYTES = 10 * 1024 * 1024  # 10 МБ
+
+# Общая HTTP-сессия обогащения (загрузка картинок)
+HTTP_POOL_SIZE = 8                  # одновременных соединений на сессию
+HTTP_TIMEOUT = 30                   # секунд на весь запрос
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # картинки больше 10 МБ не скачиваем
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+HTTP_VALIDATORS_TTL = 30 * 24 * 3600       # ETag/Last-Modified скачанных картинок
+HTTP_VALIDATORS_MAX_BYTES = 2 * 1024 * 1024  # 2 МБ
+IMAGE_QUERY_CACHE_TTL = 30 * 24 * 3600  # запрос -> URL картинки с Pexels
+IMAGE_GC_GRACE = 24 * 3600              # картинки без ссылок удаляются не раньше, чем через сутки
+
+# Уменьшенные копии картинок для экранов тренировки и курирования
+THUMB_DIR = IMAGE_DIR / "thumbs"
+THUMB_SIZE = (480, 480)  # вписываем в квадрат, пропорции сохраняются
+THUMB_QUALITY = 85       # качество JPEG
+
+# Фоновая очередь синтеза озвучки (core/audio_store.py)
+AUDIO_MAX_PARALLEL = 3
+AUDIO_DRAIN_TIMEOUT = 10      # сколько секунд при выходе ждем начатый синтез
+AUDIO_BACKFILL_LIMIT = 200    # сколько концептов без озвучки ставим в очередь при старте
+
+# Предзагрузка медиа следующих карточек на экране тренировки (core/media_prefetch.py)
+PREFETCH_DEPTH = 3          # сколько карточек вперед готовим
+PREFETCH_MAX_TEXTURES = 12  # LRU-предел текстур в памяти
+
+# Звуки интерфейса и озвучка карточек (core/sound_bank.py)
+SOUND_EFFECTS = {'correct': 'assets/tmp/correct.mp3', 'wrong': 'assets/tmp/wrong.mp3'}
+SOUND_BANK_MAX_CLIPS = 12   # LRU-предел загруженных клипов озвучки карточек
+
+# Прогноз нагрузки (core/forecast.py)
+FORECAST_DAYS = 30
+FORECAST_QUALITY_PROBS = {'again': 0.1, 'good': 0.7, 'easy': 0.2}  # как часто пользователь отвечает каждой оценкой
+
+# Отложенная запись ответов тренировки (core/review_buffer.py)
+REVIEW_JOURNAL = 'review_journal.jsonl'  # незаписанные в БД ответы на случай сбоя
+REVIEW_FLUSH_INTERVAL = 10               # секунд между фоновыми сбросами
+REVIEW_FLUSH_MAX = 20                    # сбрасываем раньше, если накопилось столько ответов
+
+# Полнотекстовый поиск (DatabaseManager.search)
+SEARCH_RANK_CANDIDATES = 2000  # сколько самых новых совпадений группы ранжируем по bm25 у частых слов
+
+# Экраны создаются при первом переходе (screens/lazy_screen_manager.py); после перехода
+# на экран из ключа в свободных кадрах заранее строятся вероятные следующие
+SCREEN_PREWARM = {
+    'deck_list': ['training_screen', 'creation_screen'],
+    'creation_screen': ['curation_screen'],
+}
+SCREEN_PREWARM_DELAY = 1.0  # секунд после перехода, чтобы не мешать анимации
@@ -1,268 +1,361 @@
 # Файл: core/database.py (ФИНАЛЬНАЯ ВЕРСИЯ v4)
-import sqlite3, logging, json, re
+import sqlite3, logging, re
+from concurrent.futures import Future
 from datetime import datetime, timezone, timedelta
+from core.db_pool import ConnectionPool
+from core.migrations import migrate
+from core.config import DB_PRAGMAS, DB_WRITE_BATCH, SEARCH_RANK_CANDIDATES
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - DB - %(levelname)s - %(message)s')
 DB_NAME = 'phraseweaver.db'
+# Сколько значений передаем в один запрос с IN (...): у SQLite есть лимит на число параметров
+SQLITE_CHUNK = 500
+
+def _chunks(seq, size):
+    for i in range(0, len(seq), size): yield seq[i:i + size]
+
+_WORD = re.compile(r'\w+')
+
+def normalize_phrase(text: str) -> str:
+    """Фраза для сравнения дубликатов: без регистра, пунктуации и лишних пробелов."""
+    return ' '.join(_WORD.findall(text.casefold()))
+
+def _fts_query(text: str, prefix: bool = True) -> str | None:
+    # Каждое слово - отдельная фраза в кавычках (синтаксис FTS5 пользователю недоступен), все слова обязательны.
+    # Префиксом ищется только последнее слово - его пользователь еще набирает.
+    words = _WORD.findall(text)
+    if not words: return None
+    return ' '.join(f'"{w}"' for w in words[:-1]) + (' ' if len(words) > 1 else '') + (f'"{words[-1]}"*' if prefix else f'"{words[-1]}"')
 
 class DatabaseManager:
     # ... (все методы до update_card_srs без изменений, но я привожу их для полноты)
     
-    def __init__(self, db_name=DB_NAME): self._db_name=db_name; self._init_db()
+    def __init__(self, db_name=DB_NAME, max_readers=4, pragmas=None):
+        self._db_name=db_name
+        # Соединения живут все время работы приложения и переиспользуются всеми потоками.
+        # Записи сериализуются фоновым потоком-писателем пула.
+        self._pool = ConnectionPool(db_name, max_readers=max_readers, pragmas=DB_PRAGMAS if pragmas is None else pragmas, max_batch=DB_WRITE_BATCH)
+        self._init_db()
     
-    def _get_connection(self):
-        try: conn = sqlite3.connect(self._db_name, check_same_thread=False); conn.row_factory=sqlite3.Row; return conn
-        except: return None
+    def close(self):
+        """Закрывает все соединения пула. Вызывается при выходе из приложения."""
+        self._pool.close()
     
     def _init_db(self):
         """
         Инициализирует/обновляет схему базы данных.
-        Создает таблицы, если они не существуют, и выполняет миграции.
+        Все изменения схемы описаны в core/migrations.py и применяются по версиям.
         """
-        conn = self._get_connection()
-        if not conn: 
-            return
         try:
-            with conn:
-                cursor = conn.cursor()
-                # --- Существующие таблицы (без изменений) ---
-                cursor.execute("CREATE TABLE IF NOT EXISTS decks (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, lang_code TEXT NOT NULL DEFAULT 'en')")
-                cursor.execute("CREATE TABLE IF NOT EXISTS concepts (id INTEGER PRIMARY KEY, deck_id INTEGER, keyword TEXT NOT NULL, translation TEXT, full_sentence TEXT, image_path TEXT, FOREIGN KEY (deck_id) REFERENCES decks (id))")
-                cursor.execute("CREATE TABLE IF NOT EXISTS cards (id INTEGER PRIMARY KEY, concept_id INTEGER, deck_id INTEGER, front TEXT NOT NULL, back TEXT NOT NULL, card_type TEXT NOT NULL, due_date DATE DEFAULT (date('now')), interval REAL DEFAULT 1, ease_factor REAL DEFAULT 2.5, repetitions INTEGER DEFAULT 0, FOREIGN KEY (concept_id) REFERENCES concepts (id), FOREIGN KEY (deck_id) REFERENCES decks (id))")
-                cursor.execute("CREATE TABLE IF NOT EXISTS review_history (id INTEGER PRIMARY KEY, card_id INTEGER, review_date TEXT, FOREIGN KEY (card_id) REFERENCES cards (id))")
-                
-                # --- ИЗМЕНЕНИЕ 1: Создаем новую таблицу для настроек ---
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS settings (
-                        key TEXT PRIMARY KEY,
-                        value TEXT NOT NULL
-                    )
-                """)
-
-                # --- ИЗМЕНЕНИЕ 2: Устанавливаем настройку по умолчанию ---
-                # ON CONFLICT(key) DO NOTHING значит, что если настройка 'target_language'
-                # уже существует, эта команда ничего не сделает.
-                cursor.execute("""
-                    INSERT INTO settings (key, value) VALUES ('target_language', 'ru')
-                    ON CONFLICT(key) DO NOTHING
-                """)
-                cursor.execute("""
-                    INSERT INTO settings (key, value) VALUES ('ui_language', 'ru')
-                    ON CONFLICT(key) DO NOTHING
-                """)
-
-                cursor.execute("PRAGMA table_info(concepts)")
-                if 'image_path' not in [col[1] for col in cursor.fetchall()]:
-                    cursor.execute("ALTER TABLE concepts ADD COLUMN image_path TEXT")
-
-                logging.info("Схема БД успешно инициализирована/обновлена.")
+            version = self._pool.write(migrate)
+            logging.info(f"Схема БД успешно инициализирована/обновлена (версия {version}).")
         except sqlite3.Error as e:
             logging.error(f"Ошибка при инициализации таблиц: {e}")
-        finally:
-            if conn: conn.close()
     
     def create_deck(self, name: str, lang_code: str):
-        conn=self._get_connection();
-        if not conn: return None
-        try:
-            with conn: c=conn.cursor(); c.execute("INSERT INTO decks (name, lang_code) VALUES (?, ?)", (name, lang_code)); return c.lastrowid
-        except: return None
-        finally: conn.close()
+        def insert(conn): c=conn.cursor(); c.execute("INSERT INTO decks (name, lang_code) VALUES (?, ?)", (name, lang_code)); return c.lastrowid
+        try: return self._pool.write(insert)
+        except sqlite3.Error: return None
     
     def get_all_decks(self):
-        conn=self._get_connection();
-        if not conn: return []
-        try: c=conn.cursor(); c.execute("SELECT id, name, lang_code FROM decks ORDER BY name"); return [dict(row) for row in c.fetchall()]
-        except: return []
-        finally: conn.close()
+        try:
+            with self._pool.reader() as conn: c=conn.cursor(); c.execute("SELECT id, name, lang_code FROM decks ORDER BY name"); return [dict(row) for row in c.fetchall()]
+        except sqlite3.Error: return []
     
-    def create_concept_and_cards(self, deck_id: int, keyword: str, original_keyword: str, enriched_data: dict) -> int | str | None:
-        translation, image_path, audio_path = enriched_data.get('translation'), enriched_data.get('image_path'), enriched_data.get('audio_path')
-        if not keyword: return None
-        conn = self._get_connection();
-        if not conn: return None
+    def get_deck_summaries(self) -> list[dict]:
+        """
+        Возвращает все колоды вместе со счетчиками карточек одним запросом.
+        Результат: [{'id': 1, 'name': 'General', 'lang_code': 'en', 'total': 120, 'due': 15}, ...]
+        """
+        sql = """
+            SELECT d.id, d.name, d.lang_code,
+                   COUNT(c.id) AS total,
+                   COALESCE(SUM(c.due_date <= ?), 0) AS due
+            FROM decks d
+            LEFT JOIN cards c ON c.deck_id = d.id
+            GROUP BY d.id
+            ORDER BY d.name
+        """
+        now_utc = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
         try:
-            with conn:
-                c=conn.cursor(); c.execute("SELECT id FROM concepts WHERE keyword = ? AND deck_id = ?", (keyword, deck_id))
-                if c.fetchone(): return "duplicate"
-                c.execute("INSERT INTO concepts (deck_id, keyword, translation, full_sentence, image_path) VALUES (?, ?, ?, ?, ?)",(deck_id, keyword, translation, keyword, image_path))
-                concept_id = c.lastrowid
-                logging.info(f"Концепт '{keyword[:30]}' создан с ID {concept_id}")
-                cards = self._generate_cards_for_concept(concept_id, deck_id, keyword, translation, image_path, audio_path, original_keyword)
-                if cards:
-                    c.executemany("INSERT INTO cards (concept_id, deck_id, front, back, card_type) VALUES (?, ?, ?, ?, ?)", cards)
-                    logging.info(f"Создано {len(cards)} карточек для концепта ID {concept_id}")
-            return concept_id
-        finally: conn.close()
+            with self._pool.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, (now_utc,))
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Ошибка при получении сводки по колодам: {e}")
+            return []
+    
+    def create_concept_and_cards(self, deck_id: int, keyword: str, original_keyword: str, enriched_data: dict) -> int | str | None:
+        item = dict(enriched_data, keyword=keyword, original_keyword=original_keyword)
+        return self.create_concepts_bulk(deck_id, [item])[0]
     
-    def _generate_cards_for_concept(self, c_id, d_id, p, t, i_p, a_p, ok):
-        cards=[]
-        cards.append((c_id, d_id, json.dumps({'text': p, 'image': i_p, 'audio': a_p}), t, "direct_recognition"))
-        cards.append((c_id, d_id, json.dumps({'text': t, 'image': i_p}), p, "reverse_recall"))
+    def create_concepts_bulk(self, deck_id: int, items: list[dict]) -> list[int | str | None]:
+        """
+        Сохраняет пачку концептов и их карточек одной транзакцией.
+        items: [{'keyword': ..., 'original_keyword': ..., 'translation': ..., 'image_path': ..., 'audio_path': ...}, ...]
+        Возвращает статус для каждого элемента в том же порядке:
+        ID концепта, "duplicate" или None (пустая фраза или ошибка БД).
+        """
+        statuses = [None] * len(items)
+        # Без перевода у карточек нет второй стороны - такой элемент просто получает None
+        valid = [idx for idx, it in enumerate(items) if it.get('keyword') and it.get('translation') is not None]
+        keywords = list(dict.fromkeys(items[idx]['keyword'] for idx in valid))
+        if not keywords: return statuses
+        def insert(conn):
+            c=conn.cursor()
+            # Проверка дубликатов для всей пачки (по SQLITE_CHUNK фраз на запрос из-за лимита параметров)
+            existing = set()
+            for chunk in _chunks(keywords, SQLITE_CHUNK):
+                c.execute(f"SELECT keyword FROM concepts WHERE deck_id = ? AND keyword IN ({','.join('?' * len(chunk))})", (deck_id, *chunk))
+                existing.update(row[0] for row in c.fetchall())
+            # Нечеткая проверка: фразы, отличающиеся только регистром, пунктуацией или пробелами
+            # ("Olá, mundo!" и "olá mundo"), совпадают по norm_keyword - тоже одним запросом на чанк
+            norms = {kw: normalize_phrase(kw) for kw in keywords}
+            seen = self._existing_norms(c, deck_id, [n for n in dict.fromkeys(norms.values()) if n])
+            fresh = {}
+            for idx in valid:
+                kw = items[idx]['keyword']
+                if kw in existing or norms[kw] in seen: statuses[idx] = "duplicate"
+                else: fresh[kw] = idx; seen.add(norms[kw])
+            if not fresh: return statuses
+            c.executemany("INSERT INTO concepts (deck_id, keyword, norm_keyword, translation, full_sentence, image_path, audio_path) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          [(deck_id, kw, norms[kw], items[idx].get('translation'), kw, items[idx].get('image_path'), items[idx].get('audio_path')) for kw, idx in fresh.items()])
+            cards = []
+            for chunk in _chunks(list(fresh), SQLITE_CHUNK):
+                c.execute(f"SELECT id, keyword FROM concepts WHERE deck_id = ? AND keyword IN ({','.join('?' * len(chunk))})", (deck_id, *chunk))
+                for row in c.fetchall():
+                    idx = fresh[row['keyword']]; it = items[idx]; statuses[idx] = row['id']
+                    cards.extend(self._generate_cards_for_concept(row['id'], deck_id, row['keyword'], it.get('original_keyword')))
+            if cards:
+                c.executemany("INSERT INTO cards (concept_id, deck_id, card_type, payload) VALUES (?, ?, ?, ?)", cards)
+            logging.info(f"Создано {len(fresh)} концептов и {len(cards)} карточек в колоде {deck_id}")
+            return statuses
+        try: return self._pool.write(insert)
+        except sqlite3.Error as e: logging.error(f"Ошибка при пакетном создании концептов: {e}"); return [None] * len(items)
+    
+    @staticmethod
+    def _existing_norms(cursor, deck_id: int, norms: list[str]) -> set[str]:
+        """Какие из нормализованных фраз (normalize_phrase) уже есть в колоде. Поиск по индексу (deck_id, norm_keyword)."""
+        found = set()
+        for chunk in _chunks(norms, SQLITE_CHUNK):
+            cursor.execute(f"SELECT norm_keyword FROM concepts WHERE deck_id = ? AND norm_keyword IN ({','.join('?' * len(chunk))})", (deck_id, *chunk))
+            found.update(row[0] for row in cursor.fetchall())
+        return found
+
+    # Одна группа выдачи: bm25 по не более чем SEARCH_RANK_CANDIDATES самым новым совпадениям
+    _SEARCH_SQL = """
+        SELECT co.id AS concept_id, co.deck_id, co.keyword, co.translation, h.score
+        FROM (SELECT rowid AS concept_id, bm25(concepts_fts, 10.0, 4.0, 2.0, 0.0) AS score
+              FROM concepts_fts WHERE concepts_fts MATCH ? ORDER BY rowid DESC LIMIT ?) h
+        JOIN concepts co ON co.id = h.concept_id ORDER BY h.score LIMIT ?
+    """
+
+    def search(self, query: str, deck_id: int | None = None, limit: int = 20) -> list[dict]:
+        """
+        Поиск концептов по слову, переводу и предложению - из них же собираются стороны карточек.
+        Последнее слово запроса ищется как префикс ("cas" найдет "casa"), регистр и диакритика
+        не важны. Выдача идет группами: концепты, чье слово совпадает с запросом целиком
+        (как в normalize_phrase), затем совпадения в слове, затем в переводе и предложении;
+        внутри группы - по bm25 (точные совпадения - от новых к старым, score у них None).
+        У частых слов в группе ранжируются только SEARCH_RANK_CANDIDATES самых новых
+        совпадений, более старые в выдачу этой группы не попадают.
+        [{'concept_id', 'deck_id', 'keyword', 'translation', 'score'}, ...]
+        """
+        match = _fts_query(query)
+        if not match: return []
+        # Колода - тоже условие MATCH: пересечение списков в индексе дешевле, чем проверка каждой строки
+        deck = f' AND deck_id : "{int(deck_id)}"' if deck_id is not None else ''
+        # Без колоды индекс (deck_id, norm_keyword) используется через перебор колод - их немного
+        decks, deck_params = ("deck_id = ?", (deck_id,)) if deck_id is not None else ("deck_id IN (SELECT id FROM decks)", ())
+        # Ранжировать все совпадения частого слова - сотни миллисекунд, поэтому группы ограничены
+        # SEARCH_RANK_CANDIDATES; точное совпадение слова при этом не теряется - оно ищется по индексу
+        try:
+            with self._pool.reader() as conn:
+                # Точные совпадения равноценны, поэтому без bm25: его статистика по частому слову
+                # пересчитывается заново для каждой строки, отобранной по rowid
+                exact = conn.execute(f"SELECT id AS concept_id, deck_id, keyword, translation, NULL AS score FROM concepts "
+                                     f"WHERE {decks} AND norm_keyword = ? ORDER BY id DESC LIMIT ?", (*deck_params, normalize_phrase(query), limit))
+                results = {row['concept_id']: dict(row) for row in exact}
+                for expr in (f"{{keyword}} : ({match}){deck}", f"{{translation full_sentence}} : ({match}){deck}"):
+                    if len(results) >= limit: break
+                    # Строки прошлых групп могут повториться - берем с запасом
+                    for row in conn.execute(self._SEARCH_SQL, (expr, SEARCH_RANK_CANDIDATES, limit + len(results))):
+                        results.setdefault(row['concept_id'], dict(row))
+        except sqlite3.Error as e: logging.error(f"Ошибка поиска '{query}': {e}"); return []
+        return list(results.values())[:limit]
+
+    def _generate_cards_for_concept(self, c_id, d_id, p, ok):
+        # Текст, картинка и озвучка берутся из концепта при чтении; у карточки только тип и payload
+        cards=[(c_id, d_id, "direct_recognition", None), (c_id, d_id, "reverse_recall", None)]
         if ok and re.search(re.escape(ok), p, re.IGNORECASE):
-            ctx=re.sub(re.escape(ok), "______", p, flags=re.IGNORECASE)
-            cards.append((c_id, d_id, json.dumps({'text': ctx, 'image': i_p, 'audio': a_p}), ok, "context_cloze"))
+            cards.append((c_id, d_id, "context_cloze", ok))
         return cards
     
+    def set_concept_audio(self, concept_id: int, audio_path: str) -> bool:
+        """Проставляет озвучку концепта, когда фоновый синтез закончился."""
+        def update(conn):
+            conn.execute("UPDATE concepts SET audio_path = ? WHERE id = ?", (audio_path, concept_id))
+        try: self._pool.write(update); return True
+        except sqlite3.Error as e: logging.error(f"Ошибка при сохранении озвучки концепта {concept_id}: {e}"); return False
+    
+    def get_concepts_without_audio(self, limit: int) -> list[dict]:
+        """Концепты, у которых еще нет озвучки: [{'id', 'keyword', 'lang_code'}, ...]."""
+        try:
+            with self._pool.reader() as conn:
+                c=conn.cursor(); c.execute("SELECT co.id, co.keyword, d.lang_code FROM concepts co JOIN decks d ON d.id = co.deck_id WHERE co.audio_path IS NULL LIMIT ?", (limit,))
+                return [dict(row) for row in c.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Ошибка при поиске концептов без озвучки: {e}")
+            return []
+    
+    def get_image_ref_counts(self) -> dict[str, int] | None:
+        """
+        Сколько концептов ссылается на каждый файл картинки: {'assets/images/ab12....jpg': 3, ...}.
+        None при ошибке БД - вызывающий код не должен считать файлы ничьими.
+        """
+        try:
+            with self._pool.reader() as conn:
+                c=conn.cursor(); c.execute("SELECT image_path, COUNT(id) FROM concepts WHERE image_path IS NOT NULL GROUP BY image_path")
+                return {row[0]: row[1] for row in c.fetchall()}
+        except sqlite3.Error as e:
+            logging.error(f"Ошибка при подсчете ссылок на картинки: {e}")
+            return None
+    
     def count_all_cards_in_deck(self, d_id):
-        conn=self._get_connection();
-        if not conn: return 0
-        try: c=conn.cursor(); c.execute("SELECT COUNT(id) FROM cards WHERE deck_id = ?", (d_id,)); return c.fetchone()[0]
-        except: return 0
-        finally: conn.close()
+        try:
+            with self._pool.reader() as conn: c=conn.cursor(); c.execute("SELECT COUNT(id) FROM cards WHERE deck_id = ?", (d_id,)); return c.fetchone()[0]
+        except sqlite3.Error: return 0
     
     def count_cards_for_review(self, d_id):
-        conn=self._get_connection();
-        if not conn: return 0
+        now_utc=datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
         try:
-            now_utc=datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-            c=conn.cursor(); c.execute("SELECT COUNT(id) FROM cards WHERE deck_id = ? AND due_date <= ?", (d_id, now_utc)); return c.fetchone()[0]
-        except: return 0
-        finally: conn.close()
+            with self._pool.reader() as conn: c=conn.cursor(); c.execute("SELECT COUNT(id) FROM cards WHERE deck_id = ? AND due_date <= ?", (d_id, now_utc)); return c.fetchone()[0]
+        except sqlite3.Error: return 0
     
     def get_cards_for_review(self, d_id, limit=20):
+        """
+        Карточки к повторению, стороны уже собраны из концепта:
+        [{'id', 'card_type', 'text', 'answer', 'image', 'audio', 'repetitions', 'interval', 'ease_factor'}, ...].
+        Обратная карточка показывается без озвучки - звук подсказал бы ответ.
+        """
         now_utc=datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-        sql="SELECT id, front, back, card_type, repetitions, interval, ease_factor FROM cards WHERE deck_id = ? AND due_date <= ? ORDER BY due_date LIMIT ?"
-        conn=self._get_connection();
-        if not conn: return []
-        try: c=conn.cursor(); c.execute(sql, (d_id, now_utc, limit)); return [dict(row) for row in c.fetchall()]
-        finally: conn.close()
+        sql="""
+            SELECT ca.id, ca.card_type,
+                   CASE ca.card_type WHEN 'reverse_recall' THEN co.translation ELSE co.keyword END AS text,
+                   CASE ca.card_type WHEN 'direct_recognition' THEN co.translation WHEN 'reverse_recall' THEN co.keyword ELSE ca.payload END AS answer,
+                   co.image_path AS image, CASE WHEN ca.card_type != 'reverse_recall' THEN co.audio_path END AS audio,
+                   ca.repetitions, ca.interval, ca.ease_factor
+            FROM cards ca JOIN concepts co ON co.id = ca.concept_id
+            WHERE ca.deck_id = ? AND ca.due_date <= ? ORDER BY ca.due_date LIMIT ?
+        """
+        try:
+            with self._pool.reader() as conn: c=conn.cursor(); c.execute(sql, (d_id, now_utc, limit)); cards=[dict(row) for row in c.fetchall()]
+        except sqlite3.Error as e: logging.error(f"Ошибка при получении карточек для повторения: {e}"); return []
+        for card in cards:
+            if card['card_type'] == 'context_cloze' and card['answer']:
+                card['text'] = re.sub(re.escape(card['answer']), "______", card['text'], flags=re.IGNORECASE)
+        return cards
 
-    def update_card_srs(self, card_id: int, due_date: str, interval: float, ease_factor: float, repetitions: int):
+    def get_srs_state(self, deck_id: int | None = None) -> list[tuple]:
         """
-        Обновляет SRS-данные карточки И ДЕЛАЕТ ЗАПИСЬ В ИСТОРИЮ.
+        SRS-состояние всех карточек (или одной колоды) для прогноза нагрузки:
+        [(repetitions, interval, ease_factor, 'YYYY-MM-DD'), ...]. День берется из due_date (UTC).
+        """
+        sql = "SELECT repetitions, interval, ease_factor, substr(due_date, 1, 10) FROM cards"
+        try:
+            with self._pool.reader() as conn:
+                c=conn.cursor()
+                if deck_id is None: c.execute(sql)
+                else: c.execute(sql + " WHERE deck_id = ?", (deck_id,))
+                return [tuple(row) for row in c.fetchall()]
+        except sqlite3.Error as e: logging.error(f"Ошибка при чтении SRS-состояния карточек: {e}"); return []
+
+    def submit_srs_updates(self, updates: list[dict], dedupe_history: bool = False) -> Future:
         """
-        update_sql = """
-        UPDATE cards 
-        SET due_date = ?, interval = ?, ease_factor = ?, repetitions = ?
-        WHERE id = ?
+        Ставит в очередь писателя пачку ответов и сразу возвращает Future (True после фиксации).
+        updates: [{'card_id', 'due_date', 'interval', 'ease_factor', 'repetitions', 'reviewed_at'}, ...].
+        Все карточки обновляются и записи в историю добавляются одной транзакцией.
+        dedupe_history=True не добавляет запись, если такая (card_id, review_date) уже есть -
+        для повторного применения журнала после сбоя.
         """
-        # --- ИЗМЕНЕНИЕ: Добавляем второй SQL-запрос ---
-        history_sql = """
-        INSERT INTO review_history (card_id, review_date) VALUES (?, ?)
+        history_sql = "INSERT INTO review_history (card_id, review_date, review_day) VALUES (?, ?, ?)"
+        if dedupe_history:
+            history_sql = ("INSERT INTO review_history (card_id, review_date, review_day) SELECT ?, ?, ? "
+                           "WHERE NOT EXISTS (SELECT 1 FROM review_history WHERE card_id = ? AND review_date = ?)")
+        def update(conn):
+            conn.executemany("UPDATE cards SET due_date = ?, interval = ?, ease_factor = ?, repetitions = ? WHERE id = ?",
+                             [(u['due_date'], u['interval'], u['ease_factor'], u['repetitions'], u['card_id']) for u in updates])
+            conn.executemany(history_sql, [(u['card_id'], u['reviewed_at'], u['reviewed_at'][:10]) + ((u['card_id'], u['reviewed_at']) if dedupe_history else ())
+                                           for u in updates])
+            logging.info(f"Сохранено ответов: {len(updates)}")
+            return True
+        return self._pool.submit(update)
+
+    def update_card_srs(self, card_id: int, due_date: str, interval: float, ease_factor: float, repetitions: int):
+        """
+        Обновляет SRS-данные карточки И ДЕЛАЕТ ЗАПИСЬ В ИСТОРИЮ.
         """
-        # ----------------------------------------------
-        
         now_utc = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        conn = self._get_connection()
-        if not conn: 
-            return False
+        update = {'card_id': card_id, 'due_date': due_date, 'interval': interval, 'ease_factor': ease_factor,
+                  'repetitions': repetitions, 'reviewed_at': now_utc}
         try:
-            with conn:
-                cursor = conn.cursor()
-                # Выполняем оба запроса в одной транзакции
-                cursor.execute(update_sql, (
-                    due_date, interval, ease_factor, repetitions, card_id
-                ))
-                cursor.execute(history_sql, (card_id, now_utc))
-            logging.info(f"Карточка {card_id} обновлена и запись добавлена в историю.")
-            return True
+            return self.submit_srs_updates([update]).result()
         except sqlite3.Error as e:
             logging.error(f"Ошибка при обновлении SRS карточки {card_id}: {e}")
             return False
-        finally:
-            if conn:
-                conn.close()
 
-    def get_reviews_per_day(self, days: int = 7) -> dict:
+    def get_reviews_per_day(self, days: int = 7, deck_id: int | None = None) -> dict:
         """
-        Возвращает количество повторений за каждый из последних N дней.
+        Возвращает количество повторений за каждый из последних N дней (всего или по одной колоде).
         Результат: {'2025-07-27': 50, '2025-07-26': 32, ...}
+        Читается из сводной таблицы daily_stats, а не из всей истории.
         """
         today = datetime.now(timezone.utc).date()
         date_list = [today - timedelta(days=i) for i in range(days)]
-        
-        # Запрос группирует все записи по дате и считает их
-        sql = """
-            SELECT 
-                substr(review_date, 1, 10) as review_day, 
-                COUNT(id) as count 
-            FROM review_history 
-            WHERE review_day >= ?
-            GROUP BY review_day
-        """
-        
         start_date = (today - timedelta(days=days-1)).strftime('%Y-%m-%d')
+        sql = "SELECT day, SUM(reviews) AS count FROM daily_stats WHERE day >= ?"
+        params = [start_date]
+        if deck_id is not None: sql += " AND deck_id = ?"; params.append(deck_id)
         
-        conn = self._get_connection()
-        if not conn: return {}
         try:
-            cursor = conn.cursor()
-            cursor.execute(sql, (start_date,))
-            
-            # Создаем словарь {дата: количество} из ответа БД
-            db_results = {row['review_day']: row['count'] for row in cursor.fetchall()}
+            with self._pool.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql + " GROUP BY day", params)
+                db_results = {row['day']: row['count'] for row in cursor.fetchall()}
             
             # Заполняем пропущенные дни нулями для красивого графика
-            final_stats = {dt.strftime('%Y-%m-%d'): db_results.get(dt.strftime('%Y-%m-%d'), 0) for dt in date_list}
-            return final_stats
+            return {dt.strftime('%Y-%m-%d'): db_results.get(dt.strftime('%Y-%m-%d'), 0) for dt in date_list}
             
         except sqlite3.Error as e:
-            logging.error(f"Ошибка при получении статистики по дням: {e}")
+            logging.error(f"Ошибка при получении статистики повторений: {e}")
             return {}
-        finally:
-            if conn: conn.close()
-    
-    def get_study_streak(self) -> int:
-        """Вычисляет 'ударную серию' - количество дней занятий без перерыва."""
-        sql = "SELECT DISTINCT substr(review_date, 1, 10) as review_day FROM review_history ORDER BY review_day DESC"
-        conn = self._get_connection()
-        if not conn: return 0
-        try:
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            
-            dates = [datetime.strptime(row['review_day'], '%Y-%m-%d').date() for row in cursor.fetchall()]
-            if not dates: return 0
 
-            streak = 0
-            today = datetime.now(timezone.utc).date()
-            
-            # Если сегодня занимался, начинаем с 1
-            if dates[0] == today:
-                streak = 1
-                yesterday = today - timedelta(days=1)
-                # Идем по остальным дням
-                for i in range(1, len(dates)):
-                    if dates[i] == yesterday:
-                        streak += 1
-                        yesterday -= timedelta(days=1)
-                    else:
-                        break # Нашли разрыв, останавливаемся
-            # Если сегодня не занимался, но вчера - да
-            elif dates[0] == (today - timedelta(days=1)):
-                 streak = 1 # начинаем со вчера
-                 yesterday = today - timedelta(days=2)
-                 for i in range(1, len(dates)):
-                    if dates[i] == yesterday:
-                        streak += 1
-                        yesterday -= timedelta(days=1)
-                    else:
-                        break
-            
-            return streak
+    def _stats_counters(self) -> dict[str, int]:
+        with self._pool.reader() as conn:
+            return {row['name']: row['value'] for row in conn.execute("SELECT name, value FROM stats_counters")}
 
+    def get_study_streak(self) -> int:
+        """
+        'Ударная серия' - количество дней занятий без перерыва, заканчивающихся сегодня или вчера.
+        Серию поддерживает триггер на review_history, здесь только проверяем, не прервалась ли она.
+        """
+        try:
+            counters = self._stats_counters()
         except sqlite3.Error as e:
-            logging.error(f"Ошибка при подсчете ударной серии: {e}")
+            logging.error(f"Ошибка при вычислении ударной серии: {e}")
             return 0
-        finally:
-            if conn: conn.close()
+        # Номер юлианского дня, как CAST(julianday(...) AS INTEGER) в триггере
+        today = int(datetime.now(timezone.utc).date().toordinal() + 1721424.5)
+        return counters.get('streak_length', 0) if counters.get('streak_last_day', 0) >= today - 1 else 0
 
     def count_learned_cards(self) -> int:
-        """Считает количество 'выученных' карточек (интервал > 21 дня)."""
-        sql = "SELECT COUNT(id) FROM cards WHERE interval >= 21"
-        conn = self._get_connection()
-        if not conn: return 0
+        """Количество 'выученных' карточек (интервал >= 21 дня) из счетчика, который ведут триггеры на cards."""
         try:
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            return cursor.fetchone()[0]
+            return self._stats_counters().get('learned_cards', 0)
         except sqlite3.Error as e:
             logging.error(f"Ошибка при подсчете выученных карточек: {e}")
             return 0
-        finally:
-            if conn: conn.close()
 
     def get_setting(self, key: str, default: str = None) -> str:
         """
@@ -270,18 +363,15 @@ class DatabaseManager:
         Если настройка не найдена, возвращает значение по умолчанию.
         """
         sql = "SELECT value FROM settings WHERE key = ?"
-        conn = self._get_connection()
-        if not conn: return default
         try:
-            cursor = conn.cursor()
-            cursor.execute(sql, (key,))
-            row = cursor.fetchone()
-            return row['value'] if row else default
+            with self._pool.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, (key,))
+                row = cursor.fetchone()
+                return row['value'] if row else default
         except sqlite3.Error as e:
             logging.error(f"Ошибка получения настройки '{key}': {e}")
             return default
-        finally:
-            if conn: conn.close()
 
     def set_setting(self, key: str, value: str):
         """
@@ -290,14 +380,8 @@ class DatabaseManager:
         # REPLACE INTO - это удобная команда SQLite, которая работает как INSERT или UPDATE
         # Если ключ уже есть - он обновит значение. Если нет - вставит новую строку.
         sql = "REPLACE INTO settings (key, value) VALUES (?, ?)"
-        conn = self._get_connection()
-        if not conn: return
         try:
-            with conn:
-                cursor = conn.cursor()
-                cursor.execute(sql, (key, value))
+            self._pool.write(lambda conn: conn.execute(sql, (key, value)))
             logging.info(f"Настройка '{key}' установлена в '{value}'.")
         except sqlite3.Error as e:
-            logging.error(f"Ошибка сохранения настройки '{key}': {e}")
-        finally:
-            if conn: conn.close()
\ No newline at end of file
+            logging.error(f"Ошибка сохранения настройки '{key}': {e}")
\ No newline at end of file
@@ -0,0 +1,138 @@
+# Файл: core/db_pool.py
+import sqlite3, logging, threading, queue
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Держит соединения с SQLite открытыми все время работы приложения.
+    Читатели берут соединение из небольшого пула (любой поток - экраны,
+    run_in_executor, тренировка). Все записи выполняет один фоновый поток-писатель:
+    операции из очереди объединяются в одну транзакцию (group commit), а в режиме
+    WAL читатели в других потоках при этом не блокируются.
+    """
+
+    def __init__(self, db_name: str, max_readers: int = 4, timeout: float = 5.0, pragmas: dict | None = None, max_batch: int = 64):
+        self._db_name = db_name
+        self._timeout = timeout
+        self._pragmas = dict(pragmas or {})
+        self._max_batch = max_batch
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_readers)
+        self._opened = []
+        self._lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._writer_thread = None
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_name, check_same_thread=False, timeout=self._timeout)
+        conn.row_factory = sqlite3.Row
+        for name, value in self._pragmas.items():
+            if name != 'journal_mode':
+                conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._opened.append(conn)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """Выдает соединение для чтения и возвращает его в пул после использования."""
+        if not self._slots.acquire(timeout=self._timeout):
+            raise sqlite3.OperationalError("Пул соединений исчерпан")
+        try:
+            try: conn = self._idle.get_nowait()
+            except queue.Empty: conn = self._connect()
+            try:
+                yield conn
+            finally:
+                # Не оставляем открытых транзакций в соединении, которое вернется в пул
+                if conn.in_transaction: conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def submit(self, fn) -> Future:
+        """
+        Ставит fn(conn) в очередь писателя. Future получает результат fn
+        только после фиксации транзакции, в которую попала операция.
+        """
+        future = Future()
+        if threading.current_thread() is self._writer_thread:
+            # Вложенный вызов из самой операции записи: выполняем сразу,
+            # в той же транзакции, иначе поток будет ждать сам себя.
+            ok, value = self._run_one(self._writer_conn, fn)
+            future.set_result(value) if ok else future.set_exception(value)
+            return future
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Пул соединений закрыт")
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+                self._writer_thread.start()
+            self._writes.put((fn, future))
+        return future
+
+    def write(self, fn):
+        """Выполняет fn(conn) в потоке-писателе и ждет фиксации. При ошибке ее изменения откатываются."""
+        return self.submit(fn).result()
+
+    @staticmethod
+    def _run_one(conn, fn):
+        # Каждая операция в своей точке сохранения: ошибка одной не откатывает
+        # остальные операции той же групповой транзакции.
+        conn.execute("SAVEPOINT op")
+        try:
+            value = fn(conn)
+            conn.execute("RELEASE op")
+            return True, value
+        except Exception as e:
+            conn.execute("ROLLBACK TO op")
+            conn.execute("RELEASE op")
+            return False, e
+
+    def _writer_loop(self):
+        conn = self._writer_conn = self._connect()
+        if 'journal_mode' in self._pragmas:
+            mode = conn.execute(f"PRAGMA journal_mode = {self._pragmas['journal_mode']}").fetchone()[0]
+            logging.info(f"Режим журнала SQLite: {mode}")
+        stop = False
+        while not stop:
+            item = self._writes.get()
+            if item is None: break
+            batch = [item]
+            while len(batch) < self._max_batch:
+                try: item = self._writes.get_nowait()
+                except queue.Empty: break
+                if item is None: stop = True; break
+                batch.append(item)
+
+            outcomes = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for fn, _ in batch:
+                    outcomes.append(self._run_one(conn, fn))
+                conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Ошибка групповой записи ({len(batch)} операций): {e}")
+                if conn.in_transaction: conn.rollback()
+                for _, future in batch: future.set_exception(e)
+                continue
+            for (_, future), (ok, value) in zip(batch, outcomes):
+                future.set_result(value) if ok else future.set_exception(value)
+
+    def close(self):
+        """Дожидается записи очереди и закрывает все соединения. Вызывается при выходе из приложения."""
+        with self._lock:
+            self._closed = True
+            writer = self._writer_thread
+        if writer is not None:
+            self._writes.put(None)
+            writer.join()
+        with self._lock:
+            for conn in self._opened:
+                try: conn.close()
+                except sqlite3.Error as e: logging.error(f"Ошибка при закрытии соединения: {e}")
+            self._opened.clear()
+            while not self._idle.empty(): self._idle.get_nowait()
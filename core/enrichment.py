@@ -1,56 +1,148 @@
 # Файл: core/enrichment.py (ФИНАЛЬНАЯ ВЕРСИЯ v6)
 
-import asyncio, logging, os, hashlib, aiohttp
+import asyncio, logging, os, tempfile, threading, aiohttp
 from pathlib import Path
-from core.ai_generator import generate_examples_with_ai
+from core.ai_generator import generate_examples_with_ai, gemini_clients
 from core.image_finder import find_image_via_api
-from gtts import gTTS
+from core.scheduler import scheduler, ServiceStatusError, RETRYABLE_STATUSES
+from core.cache import PersistentCache
+from core.loop_local import LoopLocal
+from core.image_store import image_store, PARTIAL_SUFFIX
+from core.thumbnails import make_thumbnail
+from core.audio_store import audio_store
+from core.config import AUDIO_DIR, IMAGE_DIR, TRANSLATION_CACHE_TTL, TRANSLATION_CACHE_MAX_BYTES, HTTP_POOL_SIZE, HTTP_TIMEOUT, MAX_IMAGE_BYTES, DOWNLOAD_CHUNK_SIZE, HTTP_VALIDATORS_TTL, HTTP_VALIDATORS_MAX_BYTES
 from googletrans import Translator
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - ENRICH - %(levelname)s - %(message)s')
-AUDIO_DIR, IMAGE_DIR = Path("assets/audio"), Path("assets/images")
+# Сколько символов отправляем в одном запросе на перевод (у сервиса лимит ~5000)
+TRANSLATE_MAX_CHARS = 4500
+
+# Полные названия языков для AI-промптов
+LANG_NAMES = {'en': 'English', 'ru': 'Russian', 'es': 'Spanish', 'pt': 'Portuguese', 'pl': 'Polish'}
+
+def language_name(lang_code: str) -> str: return LANG_NAMES.get(lang_code, lang_code)
 
 def ensure_dir_exists(*dirs): [d.mkdir(parents=True, exist_ok=True) for d in dirs if not d.exists()]
 ensure_dir_exists(AUDIO_DIR, IMAGE_DIR)
 
-async def get_translation(text: str, from_lang: str, to_lang: str) -> str | None:
-    try:
-        def translate_sync(): return Translator().translate(text, src=from_lang, dest=to_lang).text
-        return await asyncio.get_running_loop().run_in_executor(None, translate_sync)
-    except Exception as e: logging.error(f"Ошибка перевода: {e}"); return None
+# Переводы кэшируются на диске по (text, src, dest)
+translation_cache = PersistentCache('translations', ttl=TRANSLATION_CACHE_TTL, max_bytes=TRANSLATION_CACHE_MAX_BYTES)
+# Translator держит HTTP-клиент, поэтому создаем его один раз на поток исполнителя, а не на каждый вызов
+_translators = threading.local()
 
-# --- ИЗМЕНЕНИЕ ЗДЕСЬ: Убираем ненужный параметр 'target_lang' ---
-async def generate_audio(text: str, lang: str, prefix: str):
-    try:
-        path = AUDIO_DIR / f"{prefix}_{hashlib.md5(text.encode()).hexdigest()[:8]}.mp3"
-        if path.exists(): return str(path)
-        
-        tld_map = {'pt': 'pt'}
-        tld = tld_map.get(lang, 'com')
+def _get_translator() -> Translator:
+    if not hasattr(_translators, 'instance'): _translators.instance = Translator()
+    return _translators.instance
+
+def _translate_batch_sync(texts: list[str], from_lang: str, to_lang: str) -> list[str]:
+    # Склеиваем строки через перевод строки, чтобы перевести все одним запросом.
+    # Если сервис изменил число строк, переводим списком (googletrans делает это по одной).
+    translator = _get_translator()
+    if len(texts) > 1 and not any('\n' in t for t in texts):
+        parts = translator.translate('\n'.join(texts), src=from_lang, dest=to_lang).text.split('\n')
+        if len(parts) == len(texts): return [p.strip() for p in parts]
+    return [t.text for t in translator.translate(texts, src=from_lang, dest=to_lang)] if len(texts) > 1 else [translator.translate(texts[0], src=from_lang, dest=to_lang).text]
+
+async def get_translations(texts: list[str], from_lang: str, to_lang: str) -> list[str | None]:
+    """
+    Переводит список строк: сначала из кэша, остальное - одним запросом к сервису.
+    Возвращает переводы в том же порядке (None для строк, которые не удалось перевести).
+    """
+    results = [None] * len(texts)
+    missing = {}
+    for i, text in enumerate(texts):
+        if not text: results[i] = text; continue
+        if (cached := translation_cache.get(PersistentCache.make_key(text, from_lang, to_lang))) is not None: results[i] = cached
+        else: missing.setdefault(text, []).append(i)
+    if not missing: return results
+    # Сервис принимает ограниченный объем текста за раз - делим на группы
+    groups, size = [[]], 0
+    for text in missing:
+        if groups[-1] and size + len(text) > TRANSLATE_MAX_CHARS: groups.append([]); size = 0
+        groups[-1].append(text); size += len(text) + 1
+    loop = asyncio.get_running_loop()
+    for group in groups:
+        try: translated = await scheduler.call('translate', lambda: loop.run_in_executor(None, _translate_batch_sync, group, from_lang, to_lang))
+        except Exception as e: logging.error(f"Ошибка перевода: {e}"); continue
+        for text, value in zip(group, translated):
+            translation_cache.set(PersistentCache.make_key(text, from_lang, to_lang), value)
+            for i in missing[text]: results[i] = value
+    return results
+
+async def get_translation(text: str, from_lang: str, to_lang: str) -> str | None:
+    return (await get_translations([text], from_lang, to_lang))[0]
 
-        tts = await asyncio.get_running_loop().run_in_executor(None, lambda: gTTS(text=text, lang=lang, tld=tld, slow=False))
-        await asyncio.get_running_loop().run_in_executor(None, tts.save, str(path))
-        logging.info(f"Аудио '{text}' ({lang} / {tld}) сохранено: {path}")
-        return str(path)
+async def generate_audio(text: str, lang: str) -> str | None:
+    """Озвучка фразы через общее хранилище audio_store: одинаковый текст синтезируется один раз."""
+    try: return await audio_store.synthesize(text, lang)
     except Exception as e:
         logging.error(f"Ошибка генерации аудио: {e}"); return None
 
+def _new_http_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT))
+
+# Одна долгоживущая HTTP-сессия с пулом соединений на каждый event loop:
+# DNS, TCP и TLS не устанавливаются заново для каждой картинки.
+_http_sessions = LoopLocal(_new_http_session)
+# ETag/Last-Modified уже скачанных файлов для условных GET-запросов
+http_validators = PersistentCache('http_validators', ttl=HTTP_VALIDATORS_TTL, max_bytes=HTTP_VALIDATORS_MAX_BYTES)
+
+async def _stream_to_store(response: aiohttp.ClientResponse, suffix: str) -> Path:
+    """
+    Пишет тело ответа кусками во временный файл, попутно считая SHA-256,
+    и атомарно переносит его в хранилище картинок под именем хэша.
+    """
+    loop = asyncio.get_running_loop()
+    fd, tmp_name = tempfile.mkstemp(dir=image_store.root, suffix=PARTIAL_SUFFIX)
+    hasher, size = image_store.new_hasher(), 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_IMAGE_BYTES: raise ValueError(f"файл больше {MAX_IMAGE_BYTES} байт")
+                hasher.update(chunk)
+                await loop.run_in_executor(None, f.write, chunk)
+        return image_store.commit(tmp_name, hasher.hexdigest(), suffix)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+async def download_image(url: str) -> str | None:
+    """
+    Скачивает картинку в хранилище через общую сессию. Если файл уже скачан
+    и сервер отвечает 304 на условный запрос, возвращает сохраненный путь без загрузки.
+    """
+    headers = {}
+    validators = http_validators.get(url)
+    if validators and not Path(validators['path']).exists():
+        # Файл удалила сборка мусора картинок - запись больше ни к чему
+        http_validators.delete(url); validators = None
+    if validators:
+        if validators.get('etag'): headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'): headers['If-Modified-Since'] = validators['last_modified']
+    async with _http_sessions.get().get(url, headers=headers) as r:
+        # 304 осмыслен только в ответ на условный запрос; без него это неожиданный статус
+        if r.status == 304 and headers: return validators['path']
+        if r.status in RETRYABLE_STATUSES: raise ServiceStatusError(r.status)
+        if r.status != 200: logging.warning(f"Картинка не скачана, HTTP {r.status}: {url}"); return None
+        if r.content_length and r.content_length > MAX_IMAGE_BYTES: raise ValueError(f"файл больше {MAX_IMAGE_BYTES} байт")
+        path = await _stream_to_store(r, Path(url.split('?')[0]).suffix or '.jpg')
+        http_validators.set(url, {'etag': r.headers.get('ETag'), 'last_modified': r.headers.get('Last-Modified'), 'path': str(path)})
+    return str(path)
+
 async def download_and_save_image(image_url: str, query: str) -> str | None:
     if not image_url: return None
     try:
-        path = IMAGE_DIR / f"{hashlib.md5(query.encode()).hexdigest()}{Path(image_url.split('?')[0]).suffix or '.jpg'}"
-        async with aiohttp.ClientSession() as s, s.get(image_url) as r:
-            if r.status == 200:
-                with open(path, 'wb') as f: f.write(await r.read())
-                return str(path)
-    except Exception as e: logging.error(f"Ошибка скачивания картинки: {e}"); return None
-
-async def enrich_phrase(keyword: str, full_sentence: str, lang_code: str, target_lang: str) -> dict | None:
+        path = await scheduler.call('images', lambda: download_image(image_url))
+    except Exception as e: logging.error(f"Ошибка скачивания картинки для '{query}': {e}"); return None
+    # Миниатюру для экранов готовим сразу, пока пользователь еще не дошел до курирования
+    if path: await asyncio.get_running_loop().run_in_executor(None, make_thumbnail, path)
+    return path
+
+async def enrich_phrase(keyword: str, full_sentence: str, lang_code: str, target_lang: str, use_cache: bool = True) -> dict | None:
     logging.info(f"--- НАЧАЛО ОБОГАЩЕНИЯ (v6) для '{keyword}' на '{target_lang}' ---")
-    lang_map = {'en': 'English', 'ru': 'Russian', 'es': 'Spanish', 'pt': 'Portuguese', 'pl': 'Polish'}
-    target_lang_full = lang_map.get(target_lang, target_lang)
-    
-    ai_data = await generate_examples_with_ai(keyword, lang_map.get(lang_code, lang_code), target_lang_full)
+    ai_data = await generate_examples_with_ai(keyword, language_name(lang_code), language_name(target_lang), use_cache=use_cache)
     if not ai_data: return None
 
     image_query, examples = ai_data.get("image_query", keyword), ai_data.get("examples", [])
@@ -62,19 +154,25 @@ async def enrich_phrase(keyword: str, full_sentence: str, lang_code: str, target
         
     image_url_from_api = await find_image_via_api(english_image_query)
 
+    # Ключевое слово и полное предложение переводятся одним запросом
+    to_translate = [keyword] + ([full_sentence] if full_sentence and full_sentence != keyword else [])
     tasks = [
-        get_translation(keyword, from_lang=lang_code, to_lang=target_lang),
+        get_translations(to_translate, from_lang=lang_code, to_lang=target_lang),
         download_and_save_image(image_url_from_api, english_image_query),
-        generate_audio(keyword, lang_code, "keyword") # <-- Вызов теперь снова правильный
+        generate_audio(keyword, lang_code)
     ]
-    if full_sentence and full_sentence != keyword:
-        tasks.append(get_translation(full_sentence, from_lang=lang_code, to_lang=target_lang))
 
-    gathered_results = await asyncio.gather(*tasks)
+    translations, image_path, keyword_audio_path = await asyncio.gather(*tasks)
     
-    keyword_translation, image_path, keyword_audio_path = gathered_results[0], gathered_results[1], gathered_results[2]
-    full_sentence_translation = gathered_results[3] if (full_sentence and full_sentence != keyword) else None
+    keyword_translation = translations[0]
+    full_sentence_translation = translations[1] if len(translations) > 1 else None
     
     return {'keyword': keyword, 'translation': keyword_translation,
             'full_sentence_translation': full_sentence_translation, 'examples': examples,
-            'image_path': image_path, 'audio_path': keyword_audio_path}
\ No newline at end of file
+            'image_path': image_path, 'audio_path': keyword_audio_path}
+
+async def shutdown_enrichment():
+    """Освобождает ресурсы, привязанные к текущему event loop. Вызывать перед loop.close()."""
+    gemini_clients.release()
+    if session := _http_sessions.release():
+        await session.close()
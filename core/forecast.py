@@ -0,0 +1,62 @@
+# Файл: core/forecast.py
+from datetime import datetime, timezone
+import numpy as np
+from core.srs import QUALITY_SCORES, schedule_batch
+from core.config import FORECAST_DAYS, FORECAST_QUALITY_PROBS
+
+
+def state_arrays(rows: list[tuple]) -> dict[str, np.ndarray]:
+    """Строки DatabaseManager.get_srs_state -> массивы repetitions, interval, ease_factor, due_day (datetime64[D])."""
+    if not rows:
+        return {'repetitions': np.zeros(0, np.int64), 'interval': np.zeros(0), 'ease_factor': np.zeros(0),
+                'due_day': np.zeros(0, 'datetime64[D]')}
+    reps, interval, ease, due = zip(*rows)
+    return {'repetitions': np.array(reps, np.int64), 'interval': np.array(interval, np.float64),
+            'ease_factor': np.array(ease, np.float64), 'due_day': np.array(due, 'datetime64[D]')}
+
+
+def simulate(state: dict[str, np.ndarray], days: int = FORECAST_DAYS, quality_probs: dict = FORECAST_QUALITY_PROBS,
+             runs: int = 1, seed: int | None = None, today: np.datetime64 | None = None) -> np.ndarray:
+    """
+    Моделирует повторения на days дней вперед: каждый день все карточки, срок которых
+    наступил (просроченные - в первый день), получают случайную оценку с вероятностями
+    quality_probs и перепланируются через schedule_batch. Возвращает среднее по runs
+    прогонам число повторений на каждый день (массив длины days).
+    Карточки, ушедшие за горизонт, из модели выбрасываются, так что каждый следующий
+    день обрабатывает только "живые" карточки.
+    """
+    today = today if today is not None else np.datetime64(datetime.now(timezone.utc).date(), 'D')
+    names = list(quality_probs)
+    probs = np.array([quality_probs[n] for n in names], np.float64); probs /= probs.sum()
+    scores = np.array([QUALITY_SCORES[n] for n in names])
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(days, np.float64)
+
+    due0 = np.maximum((state['due_day'] - today).astype(np.int64), 0)
+    active = due0 < days
+    for _ in range(runs):
+        reps, interval, ease = state['repetitions'][active], state['interval'][active], state['ease_factor'][active]
+        due = due0[active]
+        for day in range(days):
+            if not due.size: break
+            idx = np.flatnonzero(due == day)
+            if not idx.size: continue
+            counts[day] += idx.size
+            result = schedule_batch(reps[idx], interval[idx], ease[idx], scores[rng.choice(len(scores), idx.size, p=probs)],
+                                    now=np.datetime64(0, 's'))
+            reps[idx], interval[idx], ease[idx] = result['repetitions'], result['interval'], result['ease_factor']
+            due[idx] = day + np.round(result['interval']).astype(np.int64)
+            keep = due < days
+            reps, interval, ease, due = reps[keep], interval[keep], ease[keep], due[keep]
+    return counts / runs
+
+
+def forecast_reviews(db_manager, deck_id: int | None = None, days: int = FORECAST_DAYS,
+                     quality_probs: dict = FORECAST_QUALITY_PROBS, runs: int = 1, seed: int | None = None) -> dict[str, float]:
+    """
+    Прогноз нагрузки по карточкам из БД (всем или одной колоды):
+    {'2025-08-01': 42.0, '2025-08-02': 17.0, ...} на days дней начиная с сегодняшнего (UTC).
+    """
+    today = np.datetime64(datetime.now(timezone.utc).date(), 'D')
+    counts = simulate(state_arrays(db_manager.get_srs_state(deck_id)), days, quality_probs, runs, seed, today)
+    return {str(today + np.timedelta64(i, 'D')): float(n) for i, n in enumerate(counts)}
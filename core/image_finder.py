@@ -4,6 +4,9 @@ import os
 from pexels_api import API
 import logging
 import asyncio
+from core.scheduler import scheduler
+from core.cache import PersistentCache
+from core.config import IMAGE_QUERY_CACHE_TTL
 
 try:
     PEXELS_API_KEY = os.environ["PEXELS_API_KEY"]
@@ -13,7 +16,13 @@ except KeyError:
     logging.error("КРИТИЧЕСКАЯ ОШИБКА: Ключ PEXELS_API_KEY не установлен!")
     api = None
 
+# Результаты поиска (запрос -> URL) живут в кэше IMAGE_QUERY_CACHE_TTL секунд
+image_query_cache = PersistentCache('image_queries', ttl=IMAGE_QUERY_CACHE_TTL)
+
 async def find_image_via_api(query: str) -> str | None:
+    cache_key = PersistentCache.make_key(query.strip().lower())
+    if (cached := image_query_cache.get(cache_key)) is not None:
+        return cached['url']
     if not api: return None
     
     try:
@@ -29,11 +38,13 @@ async def find_image_via_api(query: str) -> str | None:
                 return photos[0].get('src', {}).get('medium')
             return None
         
-        image_url = await loop.run_in_executor(None, search_sync)
+        image_url = await scheduler.call('pexels', lambda: loop.run_in_executor(None, search_sync))
         if image_url:
             logging.info(f"Найдена картинка через Pexels API: {image_url}")
         else:
             logging.warning(f"Картинки для '{query}' через Pexels не найдены.")
+        # Запоминаем и пустой результат, чтобы не спрашивать Pexels снова
+        image_query_cache.set(cache_key, {'url': image_url})
         return image_url
     except Exception as e:
         logging.error(f"Ошибка при работе с Pexels API: {e}")
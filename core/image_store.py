@@ -0,0 +1,95 @@
+# Файл: core/image_store.py
+import hashlib, logging, os, time
+from pathlib import Path
+from core.config import IMAGE_DIR, IMAGE_GC_GRACE, THUMB_DIR
+
+# Недокачанные временные файлы загрузчика
+PARTIAL_SUFFIX = '.part'
+
+
+class ImageStore:
+    """
+    Хранилище картинок с адресацией по содержимому: файл называется SHA-256
+    своих байтов, поэтому одна и та же фотография, найденная по разным
+    запросам, лежит на диске один раз. Ссылки на файлы - concepts.image_path;
+    collect_garbage удаляет файлы, на которые никто не ссылается, вместе
+    с их миниатюрами из thumb_dir.
+    """
+
+    def __init__(self, root: Path = IMAGE_DIR, thumb_dir: Path = THUMB_DIR):
+        self.root = Path(root)
+        self.thumb_dir = Path(thumb_dir)
+
+    def path_for(self, digest: str, suffix: str) -> Path:
+        return self.root / f"{digest}{suffix or '.jpg'}"
+
+    def new_hasher(self):
+        return hashlib.sha256()
+
+    def commit(self, tmp_path: str | Path, digest: str, suffix: str) -> Path:
+        """
+        Переносит скачанный временный файл на его постоянное место.
+        Если такая картинка уже есть, временный файл просто удаляется.
+        """
+        final = self.path_for(digest, suffix)
+        if final.exists():
+            Path(tmp_path).unlink(missing_ok=True)
+        else:
+            os.replace(tmp_path, final)
+        return final
+
+    def collect_garbage(self, ref_counts: dict[str, int], grace_seconds: float = IMAGE_GC_GRACE) -> dict:
+        """
+        Удаляет из каталога картинок файлы без ссылок (ref_counts: путь -> число концептов).
+        Свежие файлы (моложе grace_seconds) не трогаем: картинка может быть только что
+        скачана и еще ждать сохранения на экране курирования.
+        """
+        referenced = {os.path.normcase(os.path.abspath(p)) for p, count in ref_counts.items() if p and count > 0}
+        now = time.time()
+        stats = {'removed': 0, 'kept': 0, 'freed_bytes': 0}
+        if not self.root.exists():
+            return stats
+        for entry in self.root.iterdir():
+            if not entry.is_file():
+                continue
+            try:
+                st = entry.stat()
+                if os.path.normcase(os.path.abspath(entry)) in referenced or now - st.st_mtime < grace_seconds:
+                    stats['kept'] += 1
+                    continue
+                entry.unlink()
+                stats['removed'] += 1
+                stats['freed_bytes'] += st.st_size
+            except OSError as e:
+                logging.error(f"Ошибка при очистке картинки {entry}: {e}")
+        self._collect_thumbs(now, grace_seconds, stats)
+        logging.info(f"Очистка картинок: удалено {stats['removed']} файлов ({stats['freed_bytes']} байт), осталось {stats['kept']}")
+        return stats
+
+    def _collect_thumbs(self, now: float, grace_seconds: float, stats: dict):
+        # Миниатюра называется "<хэш оригинала>_<ширина>x<высота>.jpg" и живет, пока жив оригинал
+        if not self.thumb_dir.exists():
+            return
+        originals = {entry.stem for entry in self.root.iterdir() if entry.is_file()}
+        for thumb in self.thumb_dir.iterdir():
+            try:
+                st = thumb.stat()
+                if thumb.stem.rsplit('_', 1)[0] in originals or now - st.st_mtime < grace_seconds:
+                    continue
+                thumb.unlink()
+                stats['removed'] += 1
+                stats['freed_bytes'] += st.st_size
+            except OSError as e:
+                logging.error(f"Ошибка при очистке миниатюры {thumb}: {e}")
+
+
+image_store = ImageStore()
+
+
+def collect_image_garbage(db_manager, grace_seconds: float = IMAGE_GC_GRACE) -> dict:
+    """Сборка мусора в каталоге картинок по ссылкам из concepts.image_path."""
+    ref_counts = db_manager.get_image_ref_counts()
+    if ref_counts is None:
+        # Без надежного списка ссылок ничего не удаляем
+        return {'removed': 0, 'kept': 0, 'freed_bytes': 0}
+    return image_store.collect_garbage(ref_counts, grace_seconds)
@@ -53,6 +53,7 @@ TRANSLATIONS = {
         'learned_cards': 'Карточек выучено',
         'streak': 'Ударная серия',
         'activity_chart_title': 'Активность за последнюю неделю',
+        'forecast_chart_title': 'Прогноз повторений на {days} дн.',
         'chart_x_label': 'Дата',
         'chart_y_label': 'Повторения',
 
@@ -114,6 +115,7 @@ TRANSLATIONS = {
         'learned_cards': 'Cards Learned',
         'streak': 'Current Streak',
         'activity_chart_title': 'Activity in the last week',
+        'forecast_chart_title': 'Review forecast for the next {days} days',
         'chart_x_label': 'Date',
         'chart_y_label': 'Reviews',
         
@@ -0,0 +1,41 @@
+# Файл: core/loop_local.py
+import asyncio, threading, weakref
+
+
+class LoopLocal:
+    """
+    Хранит по одному объекту на каждый event loop (клиент модели, HTTP-сессия и т.п.).
+
+    Асинхронные клиенты привязываются к loop, в котором созданы, а приложение
+    запускает обогащение в разных потоках со своими loop. Поэтому объект
+    создается фабрикой при первом обращении из конкретного loop и живет,
+    пока этот loop жив. release(loop) забирает объект явно (перед loop.close()),
+    значения закрытых или удаленных сборщиком мусора loop выбрасываются сами.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._values = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def get(self, loop: asyncio.AbstractEventLoop | None = None):
+        loop = loop or asyncio.get_running_loop()
+        with self._lock:
+            for stale in [l for l in self._values if l.is_closed()]:
+                del self._values[stale]
+            value = self._values.get(loop)
+            if value is None:
+                value = self._values[loop] = self._factory()
+                self.created += 1
+            return value
+
+    def release(self, loop: asyncio.AbstractEventLoop | None = None):
+        """Забывает объект указанного (по умолчанию текущего) loop и возвращает его для закрытия."""
+        loop = loop or asyncio.get_running_loop()
+        with self._lock:
+            return self._values.pop(loop, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values)
@@ -0,0 +1,83 @@
+# Файл: core/lru.py
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Словарь с ограничением по числу записей: при переполнении выбрасывается
+    давно не использованная. on_evict(value) вызывается для вытесненных и замененных
+    значений (например, чтобы выгрузить звук). Потокобезопасен.
+    """
+
+    def __init__(self, max_items: int, on_evict=None):
+        self.max_items = max_items
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def touch(self, key) -> bool:
+        """Отмечает запись как недавно использованную, не считая это попаданием. False, если записи нет."""
+        with self._lock:
+            if key not in self._items: return False
+            self._items.move_to_end(key)
+            return True
+
+    def __contains__(self, key) -> bool:
+        with self._lock: return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock: return len(self._items)
+
+    def put(self, key, value):
+        """Кладет значение; замененное прежнее значение по тому же ключу тоже отдается on_evict."""
+        with self._lock:
+            replaced = self._items.get(key)
+            self._items[key] = value
+            self._items.move_to_end(key)
+            evicted = self._trim()
+        if replaced is not None and replaced is not value: self._evict(replaced)
+        for old in evicted: self._evict(old)
+
+    def add(self, key, value):
+        """
+        Кладет значение, только если ключа еще нет, и возвращает то, что лежит в кэше.
+        Если ключ уже занят (значение успели загрузить параллельно), остается прежнее,
+        а новое отдается on_evict: прежнее могло уже попасть к вызывающему коду.
+        """
+        with self._lock:
+            current = self._items.get(key)
+            if current is None: self._items[key] = current = value
+            self._items.move_to_end(key)
+            evicted = self._trim()
+        if current is not value: self._evict(value)
+        for old in evicted: self._evict(old)
+        return current
+
+    def _trim(self) -> list:
+        # Вызывается под self._lock
+        evicted = []
+        while len(self._items) > self.max_items:
+            evicted.append(self._items.popitem(last=False)[1])
+        self.evictions += len(evicted)
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            values, self._items = list(self._items.values()), OrderedDict()
+        for old in values: self._evict(old)
+
+    def _evict(self, value):
+        if self.on_evict: self.on_evict(value)
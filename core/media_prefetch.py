@@ -0,0 +1,92 @@
+# Файл: core/media_prefetch.py
+import logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from kivy.clock import Clock
+from kivy.core.image import ImageLoader
+from core.lru import LRUCache
+from core.sound_bank import SoundBank, sound_bank
+from core.thumbnails import display_path
+from core.config import PREFETCH_DEPTH, PREFETCH_MAX_TEXTURES
+
+
+class MediaPrefetcher:
+    """
+    Готовит медиа следующих depth карточек сессии, пока пользователь смотрит
+    на текущую: в фоновом потоке декодирует картинку (ImageLoader без OpenGL)
+    и загружает звук, а текстуру создает уже в главном потоке через Clock.
+    Текстуры держатся в своем LRU-кэше, звуки - в кэше клипов SoundBank; оба
+    ограничены, поэтому память в длинной сессии не растет.
+    """
+
+    def __init__(self, depth: int = PREFETCH_DEPTH, max_textures: int = PREFETCH_MAX_TEXTURES,
+                 bank: SoundBank = sound_bank, workers: int = 2):
+        self.depth = depth
+        self.textures = LRUCache(max_textures)
+        self.bank = bank
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        # Растет при clear(): результаты загрузок, начатых до очистки, отбрасываются
+        self._generation = 0
+
+    def prefetch(self, upcoming: list[dict]):
+        """Запускает фоновую загрузку медиа первых depth карточек из upcoming. Вызывать из главного потока."""
+        # С конца, чтобы ближайшая карточка оказалась самой свежей в LRU и не вытеснялась первой
+        for card in reversed(upcoming[:self.depth]):
+            if image := display_path(card.get('image')): self._submit(('image', image), self._decode_image)
+            if audio := card.get('audio'): self._submit(('sound', audio), self._load_sound)
+
+    def texture(self, image_path: str | None):
+        """Готовая текстура или None (тогда картинку грузит сам виджет)."""
+        return self.textures.get(image_path) if image_path else None
+
+    def sound(self, audio_path: str | None):
+        """Звук из кэша; при промахе загружается сразу и тоже кэшируется."""
+        return self.bank.clip(audio_path)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._in_flight.clear()
+        self.textures.clear(); self.bank.clear_clips()
+
+    def shutdown(self):
+        self.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, job: tuple[str, str], load):
+        kind, path = job
+        cache = self.textures if kind == 'image' else self.bank.clips
+        with self._lock:
+            if cache.touch(path) or job in self._in_flight: return
+            self._in_flight.add(job)
+            generation = self._generation
+        self._executor.submit(self._run, job, load, generation)
+
+    def _run(self, job, load, generation):
+        try:
+            result = load(job[1])
+        except Exception as e:
+            logging.error(f"Ошибка предзагрузки {job[1]}: {e}"); result = None
+        # Кэши наполняем в главном потоке: текстуры OpenGL можно создавать только там
+        Clock.schedule_once(lambda dt: self._store(job, result, generation))
+
+    def _store(self, job, result, generation):
+        kind, path = job
+        with self._lock:
+            stale = generation != self._generation
+            self._in_flight.discard(job)
+        if result is None: return
+        if stale:
+            if kind == 'sound': result.unload()
+            return
+        if kind == 'image': self.textures.put(path, result.texture)
+        else: self.bank.put_clip(path, result)
+
+    @staticmethod
+    def _decode_image(path: str):
+        # Только декодирование файла в память; сама текстура создается при обращении к .texture
+        return ImageLoader.load(path)
+
+    def _load_sound(self, path: str):
+        return self.bank.load(path)
@@ -0,0 +1,265 @@
+# Файл: core/migrations.py
+"""
+Версионированные миграции схемы БД.
+
+Номер примененной версии хранится в PRAGMA user_version, поэтому каждая
+миграция выполняется ровно один раз. Новая миграция - это новая функция
+в конце списка MIGRATIONS; старые функции никогда не меняются.
+"""
+import logging
+
+
+def _m001_base_schema(cursor):
+    """Базовые таблицы (раньше создавались в DatabaseManager._init_db)."""
+    cursor.execute("CREATE TABLE IF NOT EXISTS decks (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, lang_code TEXT NOT NULL DEFAULT 'en')")
+    cursor.execute("CREATE TABLE IF NOT EXISTS concepts (id INTEGER PRIMARY KEY, deck_id INTEGER, keyword TEXT NOT NULL, translation TEXT, full_sentence TEXT, image_path TEXT, FOREIGN KEY (deck_id) REFERENCES decks (id))")
+    cursor.execute("CREATE TABLE IF NOT EXISTS cards (id INTEGER PRIMARY KEY, concept_id INTEGER, deck_id INTEGER, front TEXT NOT NULL, back TEXT NOT NULL, card_type TEXT NOT NULL, due_date DATE DEFAULT (date('now')), interval REAL DEFAULT 1, ease_factor REAL DEFAULT 2.5, repetitions INTEGER DEFAULT 0, FOREIGN KEY (concept_id) REFERENCES concepts (id), FOREIGN KEY (deck_id) REFERENCES decks (id))")
+    cursor.execute("CREATE TABLE IF NOT EXISTS review_history (id INTEGER PRIMARY KEY, card_id INTEGER, review_date TEXT, FOREIGN KEY (card_id) REFERENCES cards (id))")
+    cursor.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    # Настройки по умолчанию. Если настройка уже существует, ничего не меняем.
+    cursor.execute("INSERT INTO settings (key, value) VALUES ('target_language', 'ru') ON CONFLICT(key) DO NOTHING")
+    cursor.execute("INSERT INTO settings (key, value) VALUES ('ui_language', 'ru') ON CONFLICT(key) DO NOTHING")
+
+    # Базы, созданные до появления картинок, не имеют колонки image_path
+    if 'image_path' not in _columns(cursor, 'concepts'):
+        cursor.execute("ALTER TABLE concepts ADD COLUMN image_path TEXT")
+
+
+def _m002_indexes_and_review_day(cursor):
+    """Индексы под горячие запросы и настоящая колонка с днем повторения."""
+    # get_cards_for_review / count_cards_for_review / get_deck_summaries
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cards_deck_due ON cards (deck_id, due_date)")
+    # Проверка дубликатов при сохранении концепта
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_concepts_deck_keyword ON concepts (deck_id, keyword)")
+    # count_learned_cards
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cards_interval ON cards (interval)")
+
+    # Группировка по substr(review_date, 1, 10) не может использовать индекс,
+    # поэтому храним день повторения отдельной колонкой.
+    if 'review_day' not in _columns(cursor, 'review_history'):
+        cursor.execute("ALTER TABLE review_history ADD COLUMN review_day TEXT")
+    cursor.execute("UPDATE review_history SET review_day = substr(review_date, 1, 10) WHERE review_day IS NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_review_history_day ON review_history (review_day)")
+
+
+def _m003_stats_rollups(cursor):
+    """
+    Сводные таблицы для экрана статистики, которые поддерживаются триггерами:
+    daily_stats - число повторений по дням и колодам, stats_counters - выученные
+    карточки (interval >= 21) и текущая ударная серия. Экран читает их за O(1),
+    сколько бы ни было истории.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day TEXT NOT NULL, deck_id INTEGER NOT NULL, reviews INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, deck_id)
+        ) WITHOUT ROWID
+    """)
+    # streak_last_day - последний день занятий как номер юлианского дня
+    cursor.execute("CREATE TABLE IF NOT EXISTS stats_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID")
+
+    # Заполняем по уже накопленным данным
+    cursor.execute("""
+        INSERT OR REPLACE INTO daily_stats (day, deck_id, reviews)
+        SELECT h.review_day, COALESCE(c.deck_id, 0), COUNT(h.id)
+        FROM review_history h LEFT JOIN cards c ON c.id = h.card_id
+        WHERE h.review_day IS NOT NULL GROUP BY h.review_day, COALESCE(c.deck_id, 0)
+    """)
+    cursor.execute("INSERT OR REPLACE INTO stats_counters VALUES ('learned_cards', (SELECT COUNT(id) FROM cards WHERE interval >= 21))")
+    cursor.execute("SELECT DISTINCT CAST(julianday(day) AS INTEGER) FROM daily_stats ORDER BY 1 DESC")
+    days = [row[0] for row in cursor.fetchall()]
+    streak = 1 if days else 0
+    while streak < len(days) and days[streak] == days[0] - streak: streak += 1
+    cursor.execute("INSERT OR REPLACE INTO stats_counters VALUES ('streak_length', ?)", (streak,))
+    cursor.execute("INSERT OR REPLACE INTO stats_counters VALUES ('streak_last_day', ?)", (days[0] if days else 0,))
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_review_history_stats AFTER INSERT ON review_history
+        BEGIN
+            INSERT INTO daily_stats (day, deck_id, reviews)
+            VALUES (NEW.review_day, COALESCE((SELECT deck_id FROM cards WHERE id = NEW.card_id), 0), 1)
+            ON CONFLICT (day, deck_id) DO UPDATE SET reviews = reviews + 1;
+            -- Следующий день продолжает серию, пропуск начинает новую, тот же или более ранний день ничего не меняет
+            UPDATE stats_counters SET value = CASE
+                WHEN CAST(julianday(NEW.review_day) AS INTEGER) = (SELECT value FROM stats_counters WHERE name = 'streak_last_day') + 1 THEN value + 1
+                WHEN CAST(julianday(NEW.review_day) AS INTEGER) > (SELECT value FROM stats_counters WHERE name = 'streak_last_day') + 1 THEN 1
+                ELSE value END
+            WHERE name = 'streak_length';
+            UPDATE stats_counters SET value = MAX(value, CAST(julianday(NEW.review_day) AS INTEGER)) WHERE name = 'streak_last_day';
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_cards_learned_insert AFTER INSERT ON cards WHEN NEW.interval >= 21
+        BEGIN UPDATE stats_counters SET value = value + 1 WHERE name = 'learned_cards'; END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_cards_learned_update AFTER UPDATE OF interval ON cards WHEN (NEW.interval >= 21) != (OLD.interval >= 21)
+        BEGIN UPDATE stats_counters SET value = value + (CASE WHEN NEW.interval >= 21 THEN 1 ELSE -1 END) WHERE name = 'learned_cards'; END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_cards_learned_delete AFTER DELETE ON cards WHEN OLD.interval >= 21
+        BEGIN UPDATE stats_counters SET value = value - 1 WHERE name = 'learned_cards'; END
+    """)
+
+
+def _m004_search_index(cursor):
+    """
+    Полнотекстовый поиск (FTS5): concepts_fts - по слову, переводу и предложению концепта
+    (external content поверх concepts), cards_fts - по тексту лицевой стороны и ответу карточки.
+    Оба индекса синхронизируются триггерами; обновления SRS front/back не трогают
+    и индекс не переписывают.
+    """
+    tokenize = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS concepts_fts USING fts5(
+            keyword, translation, full_sentence, deck_id,
+            content = 'concepts', content_rowid = 'id', {tokenize})
+    """)
+    cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(front, back, concept_id UNINDEXED, deck_id, {tokenize})")
+    cursor.execute("INSERT INTO concepts_fts (concepts_fts) VALUES ('rebuild')")
+    # Лицевая сторона - JSON {'text': ...}; в очень старых записях там просто текст
+    front_text = "CASE WHEN json_valid({0}.front) THEN json_extract({0}.front, '$.text') ELSE {0}.front END"
+    cursor.execute(f"INSERT INTO cards_fts (rowid, front, back, concept_id, deck_id) SELECT id, {front_text.format('cards')}, back, concept_id, deck_id FROM cards")
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_concepts_fts_insert AFTER INSERT ON concepts BEGIN
+            INSERT INTO concepts_fts (rowid, keyword, translation, full_sentence, deck_id)
+            VALUES (NEW.id, NEW.keyword, NEW.translation, NEW.full_sentence, NEW.deck_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_concepts_fts_delete AFTER DELETE ON concepts BEGIN
+            INSERT INTO concepts_fts (concepts_fts, rowid, keyword, translation, full_sentence, deck_id)
+            VALUES ('delete', OLD.id, OLD.keyword, OLD.translation, OLD.full_sentence, OLD.deck_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_concepts_fts_update AFTER UPDATE OF keyword, translation, full_sentence, deck_id ON concepts BEGIN
+            INSERT INTO concepts_fts (concepts_fts, rowid, keyword, translation, full_sentence, deck_id)
+            VALUES ('delete', OLD.id, OLD.keyword, OLD.translation, OLD.full_sentence, OLD.deck_id);
+            INSERT INTO concepts_fts (rowid, keyword, translation, full_sentence, deck_id)
+            VALUES (NEW.id, NEW.keyword, NEW.translation, NEW.full_sentence, NEW.deck_id);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_cards_fts_insert AFTER INSERT ON cards BEGIN
+            INSERT INTO cards_fts (rowid, front, back, concept_id, deck_id)
+            VALUES (NEW.id, {front_text.format('NEW')}, NEW.back, NEW.concept_id, NEW.deck_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_cards_fts_delete AFTER DELETE ON cards BEGIN
+            DELETE FROM cards_fts WHERE rowid = OLD.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_cards_fts_update AFTER UPDATE OF front, back, concept_id, deck_id ON cards BEGIN
+            DELETE FROM cards_fts WHERE rowid = OLD.id;
+            INSERT INTO cards_fts (rowid, front, back, concept_id, deck_id)
+            VALUES (NEW.id, {front_text.format('NEW')}, NEW.back, NEW.concept_id, NEW.deck_id);
+        END
+    """)
+
+
+def _m005_compact_cards(cursor):
+    """
+    Карточки больше не хранят копии текста, картинки и озвучки концепта: озвучка
+    переезжает в concepts.audio_path, у карточки остаются тип, SRS-состояние и
+    payload - то, чего нет в концепте (для context_cloze - пропущенное слово).
+    Текст сторон собирается из концепта при чтении (DatabaseManager.get_cards_for_review).
+    Индекс cards_fts больше не нужен: весь текст карточек теперь лежит в concepts_fts.
+    """
+    if 'audio_path' not in _columns(cursor, 'concepts'):
+        cursor.execute("ALTER TABLE concepts ADD COLUMN audio_path TEXT")
+    media = "SELECT json_extract(front, '$.{0}') FROM cards WHERE concept_id = concepts.id AND json_valid(front) AND json_extract(front, '$.{0}') IS NOT NULL LIMIT 1"
+    cursor.execute(f"UPDATE concepts SET audio_path = ({media.format('audio')}) WHERE audio_path IS NULL")
+    cursor.execute(f"UPDATE concepts SET image_path = ({media.format('image')}) WHERE image_path IS NULL")
+
+    # Пересборка таблицы (ALTER TABLE не умеет удалять колонки с NOT NULL): индексы и
+    # триггеры cards, кроме триггеров cards_fts, пересоздаются из их исходного SQL
+    cursor.execute("SELECT sql FROM sqlite_master WHERE tbl_name = 'cards' AND type IN ('index', 'trigger') AND sql IS NOT NULL AND name NOT LIKE 'trg_cards_fts_%'")
+    dependents = [row[0] for row in cursor.fetchall()]
+    cursor.execute("DROP TABLE IF EXISTS cards_fts")
+    cursor.execute("""
+        CREATE TABLE cards_new (
+            id INTEGER PRIMARY KEY, concept_id INTEGER NOT NULL, deck_id INTEGER, card_type TEXT NOT NULL, payload TEXT,
+            due_date DATE DEFAULT (date('now')), interval REAL DEFAULT 1, ease_factor REAL DEFAULT 2.5, repetitions INTEGER DEFAULT 0,
+            FOREIGN KEY (concept_id) REFERENCES concepts (id), FOREIGN KEY (deck_id) REFERENCES decks (id))
+    """)
+    cursor.execute("""
+        INSERT INTO cards_new (id, concept_id, deck_id, card_type, payload, due_date, interval, ease_factor, repetitions)
+        SELECT id, concept_id, deck_id, card_type, CASE WHEN card_type = 'context_cloze' THEN back END,
+               due_date, interval, ease_factor, repetitions
+        FROM cards WHERE concept_id IS NOT NULL
+    """)
+    cursor.execute("DROP TABLE cards")
+    # Триггер review_history ссылается на cards; без legacy-режима RENAME проверяет схему
+    # в момент, когда cards уже удалена, и падает
+    cursor.execute("PRAGMA legacy_alter_table = ON")
+    try: cursor.execute("ALTER TABLE cards_new RENAME TO cards")
+    finally: cursor.execute("PRAGMA legacy_alter_table = OFF")
+    for sql in dependents: cursor.execute(sql)
+    # Карточки без концепта не переносятся, а DROP TABLE триггеры удаления не вызывает
+    cursor.execute("UPDATE stats_counters SET value = (SELECT COUNT(id) FROM cards WHERE interval >= 21) WHERE name = 'learned_cards'")
+
+
+
+def _m006_normalized_keywords(cursor):
+    """
+    concepts.norm_keyword - слово в форме normalize_phrase (без регистра, пунктуации
+    и лишних пробелов) под индексом: нечеткая проверка дубликатов при сохранении
+    ищет всю пачку по индексу, а не перебирает совпадения в concepts_fts по каждой фразе.
+    """
+    from core.database import normalize_phrase  # core.database сам импортирует этот модуль
+    if 'norm_keyword' not in _columns(cursor, 'concepts'):
+        cursor.execute("ALTER TABLE concepts ADD COLUMN norm_keyword TEXT")
+    cursor.connection.create_function('normalize_phrase', 1, normalize_phrase, deterministic=True)
+    cursor.execute("UPDATE concepts SET norm_keyword = normalize_phrase(keyword) WHERE norm_keyword IS NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_concepts_deck_norm ON concepts (deck_id, norm_keyword)")
+
+# (версия, описание, функция). Версии идут строго по возрастанию.
+MIGRATIONS = [
+    (1, "базовая схема", _m001_base_schema),
+    (2, "индексы и review_history.review_day", _m002_indexes_and_review_day),
+    (3, "сводные таблицы статистики", _m003_stats_rollups),
+    (4, "полнотекстовый поиск", _m004_search_index),
+    (5, "карточки без копий текста и медиа концепта", _m005_compact_cards),
+    (6, "нормализованные слова концептов", _m006_normalized_keywords),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _columns(cursor, table: str) -> list[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn) -> int:
+    """
+    Применяет все еще не выполненные миграции и возвращает итоговую версию схемы.
+    Каждая миграция выполняется в своей точке сохранения (SAVEPOINT) вместе
+    с записью новой версии, так что упавшая миграция не оставляет схему
+    наполовину обновленной.
+    """
+    version = get_schema_version(conn)
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        conn.execute("SAVEPOINT migration")
+        try:
+            apply(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.execute("RELEASE migration")
+        except Exception:
+            conn.execute("ROLLBACK TO migration")
+            conn.execute("RELEASE migration")
+            raise
+        logging.info(f"Миграция схемы {target} ({description}) применена.")
+        version = target
+    return version
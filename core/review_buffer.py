@@ -0,0 +1,105 @@
+# Файл: core/review_buffer.py
+import json, logging, os, threading
+from datetime import datetime, timezone
+from pathlib import Path
+from core.config import REVIEW_JOURNAL, REVIEW_FLUSH_MAX
+
+
+class ReviewBuffer:
+    """
+    Отложенная запись ответов тренировки. record() только дописывает ответ в
+    память и строку в журнал (JSON Lines) - без обращения к БД, поэтому ответ
+    не ждет диска в главном потоке. flush() отдает накопленное писателю БД
+    одной транзакцией (submit_srs_updates) и не блокирует вызывающего;
+    после фиксации журнал переписывается только с еще не записанными ответами.
+    Если приложение упало, replay_journal() при следующем запуске дописывает
+    ответы из журнала в БД.
+    """
+
+    def __init__(self, db_manager, journal_path: str | Path = REVIEW_JOURNAL, flush_max: int = REVIEW_FLUSH_MAX):
+        self.db_manager = db_manager
+        self.journal_path = Path(journal_path)
+        self.flush_max = flush_max
+        self._pending = []
+        self._in_flight = None
+        self._lock = threading.Lock()
+        # Установлено, когда ни одна пачка не пишется
+        self._idle = threading.Event(); self._idle.set()
+
+    def record(self, card_id: int, srs_result: dict):
+        """Запоминает ответ: srs_result - результат calculate_next_due_date."""
+        update = {'card_id': card_id, **srs_result, 'reviewed_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}
+        with self._lock:
+            self._pending.append(update)
+            # Сброс буфера Python без fsync: переживает падение приложения, а ответ не ждет диска
+            with open(self.journal_path, 'a', encoding='utf-8') as f: f.write(json.dumps(update) + '\n')
+            full = len(self._pending) >= self.flush_max
+        if full: self.flush()
+
+    def pending(self) -> int:
+        with self._lock: return len(self._pending) + (len(self._in_flight) if self._in_flight else 0)
+
+    def flush(self):
+        """
+        Отправляет накопленные ответы на запись и сразу возвращает Future (или None, если
+        отправлять нечего или предыдущая пачка еще пишется - тогда ответы уйдут сразу после нее).
+        """
+        with self._lock:
+            if not self._pending or self._in_flight is not None: return None
+            batch, self._pending, self._in_flight = self._pending, [], self._pending
+            self._idle.clear()
+        try:
+            future = self.db_manager.submit_srs_updates(batch)
+        except Exception as e:
+            self._done(batch, e); return None
+        future.add_done_callback(lambda f: self._done(batch, f.exception()))
+        return future
+
+    def _done(self, batch: list[dict], error):
+        with self._lock:
+            self._in_flight = None
+            if error is not None:
+                # Возвращаем пачку в начало очереди; журнал не трогаем - в нем она еще есть
+                logging.error(f"Не удалось сохранить {len(batch)} ответов, повторим позже: {error}")
+                self._pending = batch + self._pending
+            else:
+                self._rewrite_journal(self._pending)
+            # Ответы, пришедшие, пока пачка писалась: их flush() вернул None, а периодического
+            # сброса уже может не быть (экран тренировки закрыт) - отправляем их сразу
+            follow_up = error is None and bool(self._pending)
+            self._idle.set()
+        if follow_up: self.flush()
+
+    def _rewrite_journal(self, remaining: list[dict]):
+        if not remaining:
+            self.journal_path.unlink(missing_ok=True); return
+        tmp = self.journal_path.with_suffix(self.journal_path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f: f.writelines(json.dumps(u) + '\n' for u in remaining)
+        os.replace(tmp, self.journal_path)
+
+    def close(self, timeout: float = 10.0, attempts: int = 3):
+        """Сбрасывает все, что осталось, и ждет фиксации. Вызывать до закрытия БД."""
+        for _ in range(attempts):
+            if not self._idle.wait(timeout) or self.flush() is None: break
+        self._idle.wait(timeout)
+        if left := self.pending():
+            logging.warning(f"В БД не попало ответов: {left}; они останутся в журнале {self.journal_path}")
+
+
+def replay_journal(db_manager, journal_path: str | Path = REVIEW_JOURNAL) -> int:
+    """
+    Дописывает в БД ответы, оставшиеся в журнале после аварийного завершения.
+    Записи истории, которые успели попасть в БД до сбоя, не дублируются. Возвращает число ответов.
+    """
+    journal_path = Path(journal_path)
+    if not journal_path.exists(): return 0
+    updates = []
+    with open(journal_path, encoding='utf-8') as f:
+        for line in f:
+            try: updates.append(json.loads(line))
+            except ValueError: logging.warning(f"Пропущена поврежденная строка журнала ответов: {line[:80]!r}")
+    if updates:
+        db_manager.submit_srs_updates(updates, dedupe_history=True).result()
+        logging.info(f"Из журнала восстановлено ответов: {len(updates)}")
+    journal_path.unlink(missing_ok=True)
+    return len(updates)
@@ -0,0 +1,204 @@
+# Файл: core/scheduler.py
+import asyncio, logging, random, re, threading, time
+from core.config import SERVICE_LIMITS
+
+# HTTP-статусы, после которых запрос имеет смысл повторить
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+_STATUS_IN_MESSAGE = re.compile(r'\b(429|50[0234])\b|rate limit|too many requests|resource exhausted', re.IGNORECASE)
+
+
+class ServiceStatusError(Exception):
+    """HTTP-ответ с ошибочным статусом; бросается обертками вокруг запросов, чтобы планировщик мог решить, повторять ли."""
+
+    def __init__(self, status: int, message: str = ''):
+        super().__init__(message or f"HTTP {status}")
+        self.status = status
+
+
+class CircuitOpenError(Exception):
+    """Сервис временно отключен предохранителем после серии ошибок."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """429/5xx (из атрибутов исключения или из текста ошибки), таймауты и обрывы соединения."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    for attr in ('status', 'status_code', 'code'):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value in RETRYABLE_STATUSES
+    response = getattr(exc, 'response', None) or getattr(exc, 'rsp', None)
+    if isinstance(getattr(response, 'status_code', None), int):
+        return response.status_code in RETRYABLE_STATUSES
+    return bool(_STATUS_IN_MESSAGE.search(str(exc)))
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты: rate токенов в секунду, не больше burst сразу.
+    Состояние защищено threading.Lock, а ждем через asyncio.sleep, поэтому
+    одно "ведро" можно делить между event loop разных потоков.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _try_take(self) -> float:
+        """Берет токен и возвращает 0 или сколько секунд подождать до следующей попытки."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> bool:
+        """Ждет токен. Возвращает True, если пришлось ждать (запрос был приторможен)."""
+        throttled = False
+        while (wait := self._try_take()) > 0:
+            throttled = True
+            await asyncio.sleep(wait)
+        return throttled
+
+
+class CircuitBreaker:
+    """
+    После failure_threshold подряд неудачных (повторяемых) ошибок сервис считается
+    недоступным на reset_timeout секунд; затем пропускается один пробный запрос.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None: return 'closed'
+            return 'half_open' if time.monotonic() - self._opened_at >= self.reset_timeout else 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures, self._opened_at, self._probing = 0, None, False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at, self._probing = time.monotonic(), False
+
+    def release_probe(self):
+        """Пробный запрос не дал ответа (отменен): следующий вызов может пробовать снова."""
+        with self._lock: self._probing = False
+
+
+class _Service:
+    def __init__(self, name: str, rate: float, burst: float, max_retries: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 30.0, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.metrics = {'queued': 0, 'in_flight': 0, 'throttled': 0, 'retries': 0,
+                        'succeeded': 0, 'failed': 0, 'rejected': 0}
+
+    def bump(self, key: str, delta: int = 1):
+        with self.lock: self.metrics[key] += delta
+
+
+class ServiceScheduler:
+    """
+    Общий планировщик запросов к внешним сервисам обогащения (Gemini, googletrans,
+    Pexels, загрузка картинок, gTTS): у каждого свое "ведро" токенов, повторы
+    с экспоненциальной задержкой и случайным разбросом на 429/5xx и предохранитель.
+    """
+
+    def __init__(self, limits: dict):
+        self._services = {name: _Service(name, **params) for name, params in limits.items()}
+
+    def _service(self, name: str) -> _Service:
+        if name not in self._services:
+            raise KeyError(f"Неизвестный сервис '{name}'")
+        return self._services[name]
+
+    async def call(self, service: str, make_call):
+        """
+        Выполняет await make_call() с учетом ограничений сервиса.
+        make_call - функция без аргументов, возвращающая новую корутину/awaitable
+        (для повтора нужен новый объект). Бросает CircuitOpenError, если сервис
+        отключен, или последнее исключение, если попытки исчерпаны.
+        """
+        svc = self._service(service)
+        for attempt in range(svc.max_retries + 1):
+            if not svc.breaker.allow():
+                svc.bump('rejected')
+                raise CircuitOpenError(f"Сервис '{service}' временно отключен после серии ошибок")
+            # Пробный запрос полуоткрытого предохранителя должен чем-то закончиться,
+            # иначе _probing останется взведенным и сервис будет отключен навсегда
+            settled = False
+            try:
+                svc.bump('queued')
+                try:
+                    throttled = await svc.bucket.acquire()
+                finally:
+                    svc.bump('queued', -1)
+                if throttled: svc.bump('throttled')
+
+                svc.bump('in_flight')
+                try:
+                    result = await make_call()
+                except Exception as e:
+                    retryable = is_retryable(e)
+                    # Неповторяемая ошибка (404, ValueError, ...) - сервис ответил, значит он доступен
+                    if retryable: svc.breaker.record_failure()
+                    else: svc.breaker.record_success()
+                    settled = True
+                    if not retryable or attempt == svc.max_retries:
+                        svc.bump('failed')
+                        raise
+                    delay = random.uniform(0, min(svc.max_delay, svc.base_delay * 2 ** attempt))
+                    svc.bump('retries')
+                    logging.warning(f"'{service}': {e}; повтор {attempt + 1}/{svc.max_retries} через {delay:.1f} с")
+                else:
+                    svc.breaker.record_success(); settled = True
+                    svc.bump('succeeded')
+                    return result
+                finally:
+                    svc.bump('in_flight', -1)
+            finally:
+                # Отмена (CancelledError) и прочие BaseException
+                if not settled: svc.breaker.release_probe()
+            await asyncio.sleep(delay)
+
+    def metrics(self) -> dict:
+        """{'gemini': {'queued': 0, 'in_flight': 1, 'throttled': 4, ..., 'circuit': 'closed'}, ...}"""
+        result = {}
+        for name, svc in self._services.items():
+            with svc.lock: result[name] = dict(svc.metrics)
+            result[name]['circuit'] = svc.breaker.state
+        return result
+
+
+scheduler = ServiceScheduler(SERVICE_LIMITS)
@@ -0,0 +1,83 @@
+# Файл: core/sound_bank.py
+import logging, threading, time
+from kivy.core.audio import SoundLoader
+from core.lru import LRUCache
+from core.config import SOUND_EFFECTS, SOUND_BANK_MAX_CLIPS
+
+
+class SoundBank:
+    """
+    Загруженные звуки приложения. Эффекты интерфейса (effects: имя -> файл)
+    загружаются один раз - в preload() при старте или при первом play() - и
+    больше не выгружаются. Клипы озвучки карточек держатся в LRU-кэше на
+    max_clips записей; вытесненные выгружаются. metrics() - сколько загрузок,
+    сколько они заняли, попадания и промахи.
+    """
+
+    def __init__(self, effects: dict[str, str] = SOUND_EFFECTS, max_clips: int = SOUND_BANK_MAX_CLIPS):
+        self.effects = dict(effects)
+        self.clips = LRUCache(max_clips, on_evict=lambda sound: sound.unload())
+        self._loaded_effects = {}
+        self._lock = threading.Lock()
+        self._metrics = {'loads': 0, 'failed': 0, 'load_ms_total': 0.0, 'load_ms_max': 0.0,
+                         'effect_plays': 0, 'effect_cold_loads': 0}
+
+    def load(self, path: str):
+        """Загружает звук с диска (можно из фонового потока) и учитывает время загрузки. None, если не удалось."""
+        start = time.perf_counter()
+        try: sound = SoundLoader.load(path)
+        except Exception as e: logging.error(f"Ошибка загрузки звука {path}: {e}"); sound = None
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._metrics['loads'] += 1
+            self._metrics['load_ms_total'] += elapsed
+            self._metrics['load_ms_max'] = max(self._metrics['load_ms_max'], elapsed)
+            if sound is None: self._metrics['failed'] += 1
+        return sound
+
+    def preload(self):
+        """Загружает все эффекты, которые еще не загружены."""
+        for name in self.effects:
+            self._effect(name)
+        logging.info(f"Звуки интерфейса загружены: {self.metrics()}")
+
+    def _effect(self, name: str):
+        # Неудачная загрузка тоже запоминается (None), чтобы не читать диск на каждом ответе
+        if name not in self._loaded_effects:
+            self._loaded_effects[name] = self.load(self.effects[name]) if name in self.effects else None
+            with self._lock: self._metrics['effect_cold_loads'] += 1
+        return self._loaded_effects[name]
+
+    def play(self, name: str):
+        """Проигрывает эффект интерфейса по имени ('correct', 'wrong', ...)."""
+        if sound := self._effect(name):
+            if sound.state == 'play': sound.stop()
+            sound.play()
+            with self._lock: self._metrics['effect_plays'] += 1
+
+    def clip(self, path: str | None):
+        """Клип озвучки из кэша; при промахе загружается сразу и тоже кэшируется."""
+        if not path: return None
+        if (sound := self.clips.get(path)) is None and (sound := self.load(path)):
+            # Предзагрузчик мог положить этот клип, пока мы читали файл: берем тот, что в кэше
+            sound = self.clips.add(path, sound)
+        return sound
+
+    def put_clip(self, path: str, sound):
+        """
+        Кладет в кэш клип, загруженный заранее (например, предзагрузчиком в фоне).
+        Если клип уже загружен синхронно и, возможно, играет, лишняя копия выгружается.
+        """
+        self.clips.add(path, sound)
+
+    def clear_clips(self):
+        self.clips.clear()
+
+    def metrics(self) -> dict:
+        with self._lock: m = dict(self._metrics)
+        m['load_ms_avg'] = m['load_ms_total'] / m['loads'] if m['loads'] else 0.0
+        m.update(clip_hits=self.clips.hits, clip_misses=self.clips.misses, clip_evictions=self.clips.evictions, clips_cached=len(self.clips))
+        return m
+
+
+sound_bank = SoundBank()
@@ -1,16 +1,65 @@
 # Файл: core/srs.py
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
+import numpy as np
+
+# Оценка ответа по шкале SM-2
+QUALITY_SCORES = {'again': 1, 'good': 3, 'easy': 5}
+MIN_EASE_FACTOR = 1.3
+
+
+def now_utc() -> np.datetime64:
+    return np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), 's')
+
+
+def quality_scores(quality) -> np.ndarray:
+    """Массив оценок: из названий ('again', 'good', 'easy') или уже из чисел 1/3/5."""
+    quality = np.asarray(quality)
+    if quality.dtype.kind in 'UO':
+        names = np.array(list(QUALITY_SCORES)); order = np.argsort(names)
+        pos = order[np.searchsorted(names, quality, sorter=order).clip(max=len(names) - 1)]
+        if not np.all(names[pos] == quality): raise ValueError(f"Неизвестная оценка ответа, ожидаются {list(QUALITY_SCORES)}")
+        return np.array(list(QUALITY_SCORES.values()))[pos]
+    return quality.astype(np.int64)
+
+
+def schedule_batch(repetitions, interval, ease_factor, quality, now: np.datetime64 | None = None) -> dict[str, np.ndarray]:
+    """
+    SM-2 для массива карточек за один векторный проход.
+    Возвращает {'repetitions', 'interval', 'ease_factor', 'due_date'}; due_date - datetime64[s] в UTC
+    (в строки для БД переводит format_due_dates). Время now берется один раз на весь массив.
+    """
+    repetitions = np.asarray(repetitions, dtype=np.int64)
+    interval = np.asarray(interval, dtype=np.float64)
+    ease_factor = np.asarray(ease_factor, dtype=np.float64)
+    q = quality_scores(quality)
+    again = q == QUALITY_SCORES['again']
+
+    new_reps = np.where(again, 0, repetitions + 1)
+    new_interval = np.select([again | (new_reps == 1), new_reps == 2], [1.0, 6.0], interval * ease_factor)
+    penalty = 5 - q
+    new_ease = np.maximum(ease_factor + (0.1 - penalty * (0.08 + penalty * 0.02)), MIN_EASE_FACTOR)
+
+    days = np.round(new_interval).astype('timedelta64[D]')
+    due_date = (now if now is not None else now_utc()) + days
+    return {'repetitions': new_reps, 'interval': new_interval, 'ease_factor': new_ease, 'due_date': due_date}
+
+
+def format_due_dates(due_dates: np.ndarray) -> list[str]:
+    """datetime64 -> строки '%Y-%m-%dT%H:%M:%SZ', как в cards.due_date."""
+    return [s + 'Z' for s in np.datetime_as_string(np.asarray(due_dates, dtype='datetime64[s]'), unit='s').tolist()]
+
+
+def parse_due_dates(due_dates: list[str]) -> np.ndarray:
+    """Строки cards.due_date -> datetime64[s]."""
+    return np.array([d.rstrip('Z') for d in due_dates], dtype='datetime64[s]')
+
+
+def shift_due_dates(due_dates: np.ndarray, days: float) -> np.ndarray:
+    """Сдвигает все даты на days дней (например, после перерыва в занятиях)."""
+    return np.asarray(due_dates, dtype='datetime64[s]') + np.timedelta64(int(round(days * 86400)), 's')
+
 
 def calculate_next_due_date(repetitions: int, interval: float, ease_factor: float, quality: str) -> dict:
-    if quality == 'again':
-        repetitions = 0; interval = 1.0
-    else:
-        repetitions += 1
-        if repetitions == 1: interval = 1.0
-        elif repetitions == 2: interval = 6.0
-        else: interval *= ease_factor
-    ease_factor += (0.1 - (5 - {'again': 1, 'good': 3, 'easy': 5}[quality]) * (0.08 + (5 - {'again': 1, 'good': 3, 'easy': 5}[quality]) * 0.02))
-    if ease_factor < 1.3: 
-        ease_factor = 1.3
-    due_date = datetime.now(timezone.utc) + timedelta(days=int(round(interval)))
-    return {'repetitions': repetitions, 'interval': interval, 'ease_factor': ease_factor, 'due_date': due_date.strftime('%Y-%m-%dT%H:%M:%SZ')}
\ No newline at end of file
+    result = schedule_batch([repetitions], [interval], [ease_factor], [QUALITY_SCORES[quality]])
+    return {'repetitions': int(result['repetitions'][0]), 'interval': float(result['interval'][0]),
+            'ease_factor': float(result['ease_factor'][0]), 'due_date': format_due_dates(result['due_date'])[0]}
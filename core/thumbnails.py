@@ -0,0 +1,60 @@
+# Файл: core/thumbnails.py
+import logging, os, tempfile
+from pathlib import Path
+from core.config import THUMB_DIR, THUMB_SIZE, THUMB_QUALITY
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow необязателен: без него экраны показывают оригиналы
+    Image = None
+
+
+def thumb_path_for(image_path: str | Path, size: tuple[int, int] = THUMB_SIZE) -> Path:
+    """Где лежит уменьшенная копия картинки. Имя оригинала - хэш содержимого, поэтому копию не нужно инвалидировать."""
+    return THUMB_DIR / f"{Path(image_path).stem}_{size[0]}x{size[1]}.jpg"
+
+
+def make_thumbnail(image_path: str | Path, size: tuple[int, int] = THUMB_SIZE) -> str | None:
+    """
+    Создает уменьшенную копию картинки (если ее еще нет) и возвращает путь к ней.
+    Блокирующая функция - вызывать в фоне (run_in_executor / поток).
+    None, если Pillow не установлен или картинку не удалось прочитать.
+    """
+    target = thumb_path_for(image_path, size)
+    if target.exists(): return str(target)
+    if Image is None: return None
+    try:
+        THUMB_DIR.mkdir(parents=True, exist_ok=True)
+        with Image.open(image_path) as img:
+            # draft() для JPEG декодирует сразу в уменьшенном масштабе - это быстрее полного декодирования
+            img.draft('RGB', size)
+            img = img.convert('RGB')
+            img.thumbnail(size, Image.LANCZOS)
+            fd, tmp_name = tempfile.mkstemp(dir=THUMB_DIR, suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as f: img.save(f, 'JPEG', quality=THUMB_QUALITY, optimize=True)
+                os.replace(tmp_name, target)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        return str(target)
+    except Exception as e:
+        logging.error(f"Не удалось создать миниатюру для {image_path}: {e}"); return None
+
+
+def display_path(image_path: str | None, size: tuple[int, int] = THUMB_SIZE) -> str | None:
+    """Путь для показа на экране: миниатюра, если она уже готова, иначе оригинал. Ничего не декодирует."""
+    if not image_path: return None
+    thumb = thumb_path_for(image_path, size)
+    return str(thumb) if thumb.exists() else image_path
+
+
+def build_missing_thumbnails(db_manager, size: tuple[int, int] = THUMB_SIZE) -> int:
+    """Досоздает миниатюры для всех картинок из БД (например, скачанных до появления миниатюр). Возвращает число созданных."""
+    if Image is None: return 0
+    created = 0
+    for image_path in (db_manager.get_image_ref_counts() or {}):
+        if not thumb_path_for(image_path, size).exists() and Path(image_path).exists():
+            created += make_thumbnail(image_path, size) is not None
+    if created: logging.info(f"Создано миниатюр: {created}")
+    return created
@@ -0,0 +1,79 @@
+# Файл: import_cli.py
+# Массовый импорт слов без запуска интерфейса.
+# Пример: python import_cli.py words.txt --deck "Portuguese" --lang pt
+import argparse, asyncio, logging, sys
+from pathlib import Path
+
+from core.database import DatabaseManager
+from core.bulk_import import BulkImporter, Checkpoint, read_import_file
+from core.enrichment import ensure_dir_exists, AUDIO_DIR, IMAGE_DIR, shutdown_enrichment
+from core.scheduler import scheduler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Массовый импорт слов и фраз в колоду PhraseWeaver.")
+    parser.add_argument('source', help="TXT (одна строка - одно слово/предложение) или CSV (keyword[,sentence])")
+    parser.add_argument('--deck', required=True, help="Название колоды; создается, если ее нет (нужен --lang)")
+    parser.add_argument('--lang', help="Язык колоды (код, например 'pt'); по умолчанию язык существующей колоды")
+    parser.add_argument('--target', help="Язык перевода; по умолчанию настройка 'target_language'")
+    parser.add_argument('--concurrency', type=int, default=4, help="Сколько строк обогащается одновременно")
+    parser.add_argument('--batch-size', type=int, default=50, help="Размер пачки для AI-прогрева и записи в БД")
+    parser.add_argument('--examples', type=int, default=3, help="Сколько AI-примеров сохранять на каждое слово")
+    parser.add_argument('--no-audio', action='store_true', help="Не генерировать озвучку примеров")
+    parser.add_argument('--checkpoint', help="Файл чекпоинта; по умолчанию <source>.checkpoint.json")
+    return parser.parse_args(argv)
+
+
+async def run_import(args, db_manager: DatabaseManager) -> int:
+    deck = next((d for d in db_manager.get_all_decks() if d['name'] == args.deck), None)
+    if deck is None:
+        if not args.lang:
+            logging.error(f"Колода '{args.deck}' не найдена; чтобы создать ее, укажите --lang.")
+            return 2
+        deck = {'id': db_manager.create_deck(args.deck, args.lang), 'lang_code': args.lang}
+    lang_code = args.lang or deck['lang_code']
+    target_lang = args.target or db_manager.get_setting('target_language', 'ru')
+
+    rows = read_import_file(args.source)
+    checkpoint = Checkpoint(args.checkpoint or f"{args.source}.checkpoint.json")
+    importer = BulkImporter(db_manager, deck['id'], lang_code, target_lang, concurrency=args.concurrency,
+                            batch_size=args.batch_size, max_examples=args.examples,
+                            with_audio=not args.no_audio, checkpoint=checkpoint)
+    try:
+        stats = await importer.run(rows)
+    finally:
+        await shutdown_enrichment()
+
+    processed = stats['enriched'] + stats['failed']
+    rate = processed / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+    print(f"Строк: {stats['rows']} (пропущено по чекпоинту: {stats['skipped']}), обогащено: {stats['enriched']}, "
+          f"ошибок: {stats['failed']}, сохранено концептов: {stats['saved']}, дубликатов: {stats['duplicates']}")
+    print(f"Время: {stats['elapsed']:.1f} с, скорость: {rate:.2f} строк/с")
+    for service, m in scheduler.metrics().items():
+        print(f"  {service:<10} успешно: {m['succeeded']}, приторможено: {m['throttled']}, повторов: {m['retries']}, "
+              f"ошибок: {m['failed']}, отклонено: {m['rejected']}, предохранитель: {m['circuit']}")
+    if stats['failed'] == 0:
+        checkpoint.remove()
+        return 0
+    print(f"Не все строки обработаны - повторный запуск продолжит с чекпоинта {checkpoint.path}")
+    return 1
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not Path(args.source).exists():
+        print(f"Файл не найден: {args.source}")
+        return 2
+    ensure_dir_exists(AUDIO_DIR, IMAGE_DIR)
+    db_manager = DatabaseManager()
+    try:
+        return asyncio.run(run_import(args, db_manager))
+    except KeyboardInterrupt:
+        print("Импорт прерван. Повторный запуск продолжит с последнего чекпоинта.")
+        return 130
+    finally:
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,14 @@
-import os
+import time
+STARTED_AT = time.perf_counter()  # точка отсчета для замера времени до первого кадра
+import os, sys
+import logging
+import threading
 import kivymd
 from kivymd.app import MDApp
 from kivy.core.window import Window
 from kivy.lang import Builder
 from kivy.clock import Clock
+from kivy.factory import Factory
 from kivy.metrics import dp
 from kivy.uix.screenmanager import ScreenManager
 from kivy.core.clipboard import Clipboard
@@ -12,13 +17,25 @@ from kivymd.uix.button import MDFlatButton
 
 from core.localization import translator
 from core.database import DatabaseManager
-
-from screens.deck_list_screen import DeckListScreen
-from screens.creation_screen import CreationScreen
-from screens.training_screen import TrainingScreen
-from screens.curation_screen import CurationScreen
-from screens.stats_screen import StatsScreen
-from screens.settings_screen import SettingsScreen
+from core.sound_bank import sound_bank
+from core.review_buffer import ReviewBuffer, replay_journal
+
+# Экраны: (имя, класс, модуль, разметка). Ничего не импортируется и не строится, пока на экран
+# не перейдут (или LazyScreenManager не подготовит его заранее); первый в списке - стартовый.
+# Тяжелые зависимости экранов (обогащение, графики, numpy) импортируются еще позже - при первом использовании.
+SCREENS = [
+    ('deck_list', 'DeckListScreen', 'screens.deck_list_screen', 'screens/deck_list_screen.kv'),
+    ('creation_screen', 'CreationScreen', 'screens.creation_screen', 'screens/creation_screen.kv'),
+    ('curation_screen', 'CurationScreen', 'screens.curation_screen', 'screens/curation_screen.kv'),
+    ('training_screen', 'TrainingScreen', 'screens.training_screen', 'screens/training_screen.kv'),
+    ('stats_screen', 'StatsScreen', 'screens.stats_screen', 'screens/stats_screen.kv'),
+    ('settings_screen', 'SettingsScreen', 'screens.settings_screen', 'screens/settings_screen.kv'),
+]
+Factory.register('LazyScreenManager', module='screens.lazy_screen_manager')
+
+# Если переменная задана, приложение печатает время до первого кадра и закрывается (benchmarks/bench_startup.py)
+STARTUP_PROBE_ENV = 'PHRASEWEAVER_STARTUP_PROBE'
+STARTUP_PROBE_MARKER = 'STARTUP_FIRST_FRAME_MS'
 
 
 Window.size = (500, 800)
@@ -28,12 +45,46 @@ class PhraseWeaverApp(MDApp):
     translator = translator 
     sm = None
     db_manager = None
+    review_buffer = None
 
     def on_start(self):
         Clock.schedule_once(self.check_clipboard, 1)
         ui_lang = self.db_manager.get_setting('ui_language', 'ru')
         self.translator.set_language(ui_lang)
-        
+        # В фоне: удаляем картинки, на которые больше не ссылается ни один концепт,
+        # досоздаем миниатюры для старых картинок и озвучку, не доделанную в прошлый раз
+        threading.Thread(target=self._maintain_media, daemon=True).start()
+        # Звуки интерфейса загружаем один раз, в первом свободном кадре, а не на каждом ответе
+        Clock.schedule_once(lambda dt: sound_bank.preload(), 0)
+        if os.environ.get(STARTUP_PROBE_ENV): Window.bind(on_flip=self._report_first_frame)
+
+    def _report_first_frame(self, *args):
+        Window.unbind(on_flip=self._report_first_frame)
+        print(f"{STARTUP_PROBE_MARKER} {(time.perf_counter() - STARTED_AT) * 1000:.1f}", flush=True)
+        Clock.schedule_once(lambda dt: self.stop(), 0)
+
+    def _maintain_media(self):
+        from core.image_store import collect_image_garbage
+        from core.thumbnails import build_missing_thumbnails
+        from core.audio_store import backfill_missing_audio
+        collect_image_garbage(self.db_manager)
+        build_missing_thumbnails(self.db_manager)
+        backfill_missing_audio(self.db_manager)
+
+    def on_stop(self):
+        # Очередь озвучки есть, только если ее уже загрузили экран курирования или _maintain_media
+        if audio := sys.modules.get('core.audio_store'): audio.audio_jobs.shutdown()
+        # Потоки предзагрузчика не демоны: без shutdown выход ждал бы все поставленные декодирования
+        if self.sm and self.sm.is_built('training_screen') and (prefetcher := self.sm.get_screen('training_screen').prefetcher):
+            prefetcher.shutdown()
+        # Закрываем долгоживущие соединения с БД при выходе
+        logging.info(f"Звуки за сессию: {sound_bank.metrics()}")
+        # Ответы тренировки, еще не записанные в БД, сохраняем до закрытия соединений
+        if self.review_buffer:
+            self.review_buffer.close()
+        if self.db_manager:
+            self.db_manager.close()
+
     def check_clipboard(self, *args):
         clipboard_text = Clipboard.get().strip()
         if not clipboard_text:
@@ -73,22 +124,23 @@ class PhraseWeaverApp(MDApp):
         self.theme_cls.theme_style = "Light" 
 
         self.db_manager = DatabaseManager()
+        # Ответы, не успевшие попасть в БД при прошлом (аварийном) завершении
+        replay_journal(self.db_manager)
+        self.review_buffer = ReviewBuffer(self.db_manager)
         ui_lang = self.db_manager.get_setting('ui_language', 'ru')
         self.translator.set_language(ui_lang)
         
         self.sm = Builder.load_file('phraseweaver.kv')
-        
-        for screen in self.sm.screens:
-            screen.app = self
-            screen.manager = self.sm # `manager` теперь тоже устанавливается здесь
-            screen.db_manager = self.db_manager
+        # Проставляются каждому экрану при создании (`manager` проставляет сам ScreenManager)
+        self.sm.screen_attrs.update(app=self, db_manager=self.db_manager)
+        for screen in SCREENS: self.sm.register(*screen)
 
         # 3. Создаем колоду по умолчанию, если нужно.
         if not self.db_manager.get_all_decks():
             self.db_manager.create_deck("General", "en")
 
-        # 4. Возвращаем готовый ScreenManager.
-        return self.sm
+        # 4. Строим только стартовый экран и возвращаем ScreenManager.
+        self.sm.current = SCREENS[0][0]
         return self.sm
 
 # def setup_environment():
@@ -6,7 +6,6 @@ from kivymd.uix.screen import MDScreen
 from kivymd.uix.spinner import MDSpinner
 from kivymd.uix.snackbar import Snackbar
 from kivymd.app import MDApp
-from core.enrichment import enrich_phrase
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -43,6 +42,9 @@ class CreationScreen(MDScreen):
 
     # --- КЛЮЧЕВОЕ АРХИТЕКТУРНОЕ ИСПРАВЛЕНИЕ ---
     def run_enrichment(self, deck_id, lang_code, keyword, full_sentence):
+        # Обогащение тянет за собой клиентов Gemini, Pexels, gTTS и googletrans; импортируем
+        # при первом запросе и в фоновом потоке, а не при старте приложения
+        from core.enrichment import enrich_phrase, shutdown_enrichment
         app = MDApp.get_running_app()
         # Получаем настройку ПЕРЕД запуском обогащения
         target_lang = app.db_manager.get_setting('target_language', 'ru')
@@ -56,6 +58,7 @@ class CreationScreen(MDScreen):
                 enrich_phrase(keyword, full_sentence, lang_code, target_lang)
             )
         finally:
+            loop.run_until_complete(shutdown_enrichment())
             loop.close()
         self.go_to_curation_screen(deck_id, keyword, full_sentence, enriched_data)
 
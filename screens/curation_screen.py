@@ -1,4 +1,3 @@
-import asyncio
 from threading import Thread
 import re
 from kivy.clock import mainthread
@@ -6,7 +5,8 @@ from kivymd.app import MDApp
 from kivymd.uix.list import TwoLineAvatarIconListItem, IconRightWidget
 from kivymd.uix.screen import MDScreen
 from kivymd.uix.snackbar import Snackbar
-from core.enrichment import generate_audio
+from core.audio_store import audio_store, audio_jobs
+from core.thumbnails import display_path
 
 class CurationScreen(MDScreen):
     deck_id = None; lang_code = None; keyword = None; enriched_data = None
@@ -17,9 +17,7 @@ class CurationScreen(MDScreen):
         # ... (этот метод без изменений) ...
         self.ids.examples_list.clear_widgets()
         if not self.enriched_data: return
-        image_path = self.enriched_data.get('image_path')
-        self.ids.image_preview.source = image_path if image_path else 'assets/tmp/placeholder.png'
-        self.ids.image_preview.reload()
+        self.ids.image_preview.source = display_path(self.enriched_data.get('image_path')) or 'assets/tmp/placeholder.png'
         for ex in self.enriched_data.get('examples', []):
             tagged_original = ex.get('original','')
             tagged_translation = ex.get('translation','')
@@ -43,41 +41,40 @@ class CurationScreen(MDScreen):
         if not items:
             s = Snackbar(); s.text = "Нет примеров для сохранения!"; s.open()
             return
-        s = Snackbar(); s.text = "Сохранение... Это может занять несколько секунд."; s.open()
+        s = Snackbar(); s.text = "Сохранение..."; s.open()
         save_data = [{'original': i._original_phrase, 'translation': i._translation} for i in reversed(items)]
-        image_path = self.ids.image_preview.source if self.ids.image_preview.source != 'assets/tmp/placeholder.png' else None
+        # В превью может стоять миниатюра - в БД сохраняем путь к оригиналу
+        image_path = self.enriched_data.get('image_path') if self.enriched_data else None
         self.lang_code = self.manager.current_lang_code
         
         thread = Thread(target=self._blocking_save, args=(save_data, image_path))
         thread.start()
 
     def _blocking_save(self, phrases_data, image_path):
-        count = asyncio.run(self._async_save_items(phrases_data, image_path))
+        count = self._save_items(phrases_data, image_path)
         self.on_saving_complete(count)
         
-    async def _async_save_items(self, phrases_data, image_path):
+    def _save_items(self, phrases_data, image_path):
+        """
+        Сохраняет карточки сразу, не дожидаясь озвучки: готовые файлы берутся из
+        audio_store, остальное синтезирует фоновая очередь и потом дописывает в карточки.
+        """
         db_manager = MDApp.get_running_app().db_manager
-        tasks = [self.process_and_save_item(p, image_path, db_manager) for p in phrases_data]
-        results = await asyncio.gather(*tasks)
-        return sum(1 for r in results if r)
+        items = [self.prepare_item(p, image_path) for p in phrases_data]
+        # Все выбранные примеры сохраняются одной транзакцией
+        statuses = db_manager.create_concepts_bulk(self.deck_id, items)
+        for item, status in zip(items, statuses):
+            if isinstance(status, int) and not item['audio_path']:
+                audio_jobs.submit(item['keyword'], self.lang_code,
+                                  callback=lambda path, c_id=status: path and db_manager.set_concept_audio(c_id, path))
+        return sum(1 for s in statuses if s and s != "duplicate")
         
-    async def process_and_save_item(self, phrase_info, image_path, db_manager):
+    def prepare_item(self, phrase_info, image_path):
         original_phrase, translation = phrase_info['original'], phrase_info['translation']
-        audio_path = await generate_audio(original_phrase, self.lang_code, "example")
-        
-        item_data = {'translation': translation, 'image_path': image_path, 'audio_path': audio_path}
-        
-        # --- ИЗМЕНЕНИЕ ЗДЕСЬ ---
-        # Передаем и фразу-пример, и оригинальное ключевое слово
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, 
-            db_manager.create_concept_and_cards,
-            self.deck_id, 
-            original_phrase, # Это полная фраза-пример
-            self.keyword,    # А это оригинальное ключевое слово для поиска
-            item_data
-        )
-        return result and result != "duplicate"
+        audio_path = audio_store.lookup(original_phrase, self.lang_code)
+        # keyword - это полная фраза-пример, original_keyword - исходное ключевое слово для cloze-карточки
+        return {'keyword': original_phrase, 'original_keyword': self.keyword,
+                'translation': translation, 'image_path': image_path, 'audio_path': audio_path}
 
     @mainthread
     def on_saving_complete(self, count):
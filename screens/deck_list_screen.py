@@ -62,7 +62,8 @@ class DeckListScreen(MDScreen):
     def load_decks(self, dt=None):
         if not hasattr(self, 'app'):
             self.app = MDApp.get_running_app()
-        decks = self.app.db_manager.get_all_decks()
+        # Одна выборка со всеми счетчиками вместо двух запросов на каждую колоду
+        decks = self.app.db_manager.get_deck_summaries()
         deck_list_widget = self.ids.deck_list_container
         deck_list_widget.clear_widgets()
         if not decks:
@@ -70,8 +71,7 @@ class DeckListScreen(MDScreen):
             deck_list_widget.add_widget(item)
             return
         for deck in decks:
-            review_count = self.app.db_manager.count_cards_for_review(deck['id'])
-            total_count = self.app.db_manager.count_all_cards_in_deck(deck['id'])
+            review_count, total_count = deck['due'], deck['total']
             lang_name = SUPPORTED_LANGUAGES.get(deck['lang_code'], deck['lang_code'].upper())
             item = TwoLineAvatarIconListItem(text=f"{deck['name']} ({lang_name})", secondary_text=f"Всего: {total_count} | К повторению: {review_count}", on_release=lambda x, d=deck: self.go_to_creation_screen(d))
             right_button = RightButtonWidget(text="ТРЕН.", theme_text_color="Custom", text_color=self.app.theme_cls.primary_color, on_press=lambda x, d_id=deck['id']: self.go_to_training(d_id))
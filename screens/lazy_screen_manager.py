@@ -0,0 +1,77 @@
+# Файл: screens/lazy_screen_manager.py
+import logging, time
+from kivy.clock import Clock
+from kivy.factory import Factory
+from kivy.lang import Builder
+from kivy.uix.screenmanager import ScreenManager
+from core.config import SCREEN_PREWARM, SCREEN_PREWARM_DELAY
+
+
+class LazyScreenManager(ScreenManager):
+    """
+    ScreenManager, который создает экраны по требованию. Экран регистрируется
+    именем, классом, модулем и файлом разметки; модуль импортируется, KV-файл
+    загружается, а виджеты строятся при первом обращении к экрану - переходе
+    (current = ...) или get_screen(). screen_attrs проставляются каждому
+    созданному экрану (app, db_manager).
+    После перехода на экран вероятные следующие (SCREEN_PREWARM) строятся
+    заранее, по одному за кадр, когда анимация перехода уже закончилась.
+    """
+
+    def __init__(self, screen_attrs: dict | None = None, prewarm: dict[str, list[str]] = SCREEN_PREWARM,
+                 prewarm_delay: float = SCREEN_PREWARM_DELAY, **kwargs):
+        super().__init__(**kwargs)
+        self.screen_attrs = dict(screen_attrs or {})
+        self.prewarm_map = prewarm
+        self.prewarm_delay = prewarm_delay
+        self._registry = {}
+        self._loaded_kv = set()
+        self._prewarm_queue = []
+        self._prewarm_event = None
+
+    def register(self, name: str, class_name: str, module: str, kv_file: str | None = None):
+        """Регистрирует экран, ничего не импортируя и не создавая."""
+        Factory.register(class_name, module=module)
+        self._registry[name] = (class_name, kv_file)
+
+    def has_screen(self, name: str) -> bool:
+        return name in self._registry or super().has_screen(name)
+
+    def is_built(self, name: str) -> bool:
+        return super().has_screen(name)
+
+    def get_screen(self, name: str):
+        # Через get_screen идет и смена current, поэтому первый переход тоже строит экран
+        if not self.is_built(name) and name in self._registry: self._build(name)
+        return super().get_screen(name)
+
+    def on_current(self, instance, value):
+        super().on_current(instance, value)
+        if value in self.prewarm_map: self.prewarm(*self.prewarm_map[value])
+
+    def prewarm(self, *names: str):
+        """Ставит экраны в очередь на создание в свободных кадрах."""
+        self._prewarm_queue.extend(n for n in names if n in self._registry and not self.is_built(n) and n not in self._prewarm_queue)
+        if self._prewarm_queue and self._prewarm_event is None:
+            self._prewarm_event = Clock.schedule_once(self._prewarm_next, self.prewarm_delay)
+
+    def _prewarm_next(self, dt):
+        self._prewarm_event = None
+        # Пока идет анимация перехода, сборка экрана дала бы рывок - откладываем
+        if self.transition.is_active:
+            self._prewarm_event = Clock.schedule_once(self._prewarm_next, self.prewarm_delay); return
+        while self._prewarm_queue:
+            name = self._prewarm_queue.pop(0)
+            if not self.is_built(name): self._build(name); break
+        if self._prewarm_queue: self._prewarm_event = Clock.schedule_once(self._prewarm_next, 0)
+
+    def _build(self, name: str):
+        class_name, kv_file = self._registry[name]
+        start = time.perf_counter()
+        if kv_file and kv_file not in self._loaded_kv:
+            Builder.load_file(kv_file); self._loaded_kv.add(kv_file)
+        screen = Factory.get(class_name)(name=name)
+        for attr, value in self.screen_attrs.items(): setattr(screen, attr, value)
+        self.add_widget(screen)
+        logging.info(f"Экран '{name}' создан за {(time.perf_counter() - start) * 1000:.0f} мс")
+        return screen
@@ -1,11 +1,13 @@
+import logging
+from threading import Thread
 from kivy.clock import mainthread
 from kivy.utils import get_color_from_hex # Нам все еще может понадобиться для других вещей, так что оставим
 from kivymd.app import MDApp
 
-from kivy_garden.graph import Graph, LinePlot
-
 from kivymd.uix.screen import MDScreen
 
+from core.config import FORECAST_DAYS
+
 
 class StatsScreen(MDScreen):
     """
@@ -16,6 +18,7 @@ class StatsScreen(MDScreen):
         """Вызывается при входе на экран. Запускает обновление данных."""
         self.update_stats()
         self.plot_review_history()
+        self.plot_forecast()
 
     def update_stats(self):
         """Обновляет числовые показатели на карточках."""
@@ -37,6 +40,8 @@ class StatsScreen(MDScreen):
         db_manager = app.db_manager
         
         reviews_per_day = db_manager.get_reviews_per_day(days=7)
+        # Графики нужны только на этом экране - не грузим их при старте приложения
+        from kivy_garden.graph import Graph, LinePlot
         
         graph_container = self.ids.graph_container
         graph_container.clear_widgets()
@@ -76,4 +81,53 @@ class StatsScreen(MDScreen):
         graph.x_ticks_labels = [date.split('-')[-1] for date in sorted_dates]
         
         graph.add_plot(plot)
-        graph_container.add_widget(graph)
\ No newline at end of file
+        graph_container.add_widget(graph)
+
+    def plot_forecast(self):
+        """Прогноз нагрузки считается в фоне (симуляция по всем карточкам), график рисуется по готовности."""
+        self.ids.forecast_container.clear_widgets()
+        db_manager = MDApp.get_running_app().db_manager
+        Thread(target=lambda: self._draw_forecast(self._forecast(db_manager)), daemon=True).start()
+
+    @staticmethod
+    def _forecast(db_manager):
+        # Ошибка (БД, импорт numpy) попадает в лог, а _draw_forecast получает None и просто не рисует график
+        try:
+            # numpy импортируется здесь, в фоновом потоке, а не при старте приложения
+            from core.forecast import forecast_reviews
+            return forecast_reviews(db_manager, days=FORECAST_DAYS, runs=5)
+        except Exception:
+            logging.exception("Не удалось посчитать прогноз нагрузки")
+            return None
+
+    @mainthread
+    def _draw_forecast(self, forecast):
+        app = MDApp.get_running_app()
+        container = self.ids.forecast_container
+        container.clear_widgets()
+        if not forecast or not any(forecast.values()):
+            return
+
+        from kivy_garden.graph import Graph, LinePlot
+        dates = sorted(forecast)
+        ymax = max(1, int(max(forecast.values())) + 1)
+        graph = Graph(
+            xlabel=app.translator.t('chart_x_label'),
+            ylabel=app.translator.t('chart_y_label'),
+            x_ticks_minor=0,
+            x_ticks_major=7,
+            y_ticks_major=max(1, int(ymax / 5)),
+            y_grid_label=True,
+            x_grid_label=True,
+            padding=10,
+            x_grid=True,
+            y_grid=True,
+            xmin=0,
+            xmax=len(dates) - 1,
+            ymin=0,
+            ymax=ymax
+        )
+        plot = LinePlot(color=app.theme_cls.primary_color, line_width=2)
+        plot.points = [(i, forecast[date]) for i, date in enumerate(dates)]
+        graph.add_plot(plot)
+        container.add_widget(graph)
@@ -1,10 +1,23 @@
-import json, random
+import importlib, random
+from threading import Thread
 from kivy.clock import Clock
-from kivy.core.audio import SoundLoader
 from kivymd.app import MDApp
 from kivymd.uix.screen import MDScreen
 
-from core.srs import calculate_next_due_date
+from core.thumbnails import display_path
+from core.media_prefetch import MediaPrefetcher
+from core.sound_bank import sound_bank
+from core.config import REVIEW_FLUSH_INTERVAL
+
+# core.srs тянет numpy. Модуль экрана LazyScreenManager предсоздает в главном потоке,
+# поэтому сам core.srs импортируется в фоне, один раз за процесс, при первом входе на экран
+_srs_import = None
+
+def _preload_srs():
+    global _srs_import
+    if _srs_import is None:
+        _srs_import = Thread(target=importlib.import_module, args=('core.srs',), name='srs-import', daemon=True)
+        _srs_import.start()
 
 
 class TrainingScreen(MDScreen):
@@ -13,12 +26,24 @@ class TrainingScreen(MDScreen):
     current_card=None
     _current_mode=None
     _session_total=0
+    prefetcher=None
+    _flush_event=None
     
     def on_enter(self, *args):
         # Добавляем app как свойство для легкого доступа
         self.app = MDApp.get_running_app()
+        if self.prefetcher is None: self.prefetcher = MediaPrefetcher()
+        _preload_srs()
+        # Ответы пишутся в БД пачками в фоне: периодически и в конце сессии
+        self._flush_event = Clock.schedule_interval(lambda dt: self.app.review_buffer.flush(), REVIEW_FLUSH_INTERVAL)
         self.load_session_cards(); self.show_next_card()
     
+    def on_leave(self, *args):
+        if self._flush_event: self._flush_event.cancel()
+        self.app.review_buffer.flush()
+        # Текстуры и звуки прошлой сессии больше не нужны
+        if self.prefetcher: self.prefetcher.clear()
+    
     def load_session_cards(self):
         self.deck_id = self.manager.current_deck_id
         self.all_cards = self.app.db_manager.get_cards_for_review(self.deck_id)
@@ -33,13 +58,9 @@ class TrainingScreen(MDScreen):
 
         self.current_card = self.all_cards.pop(0)
         card_type = self.current_card['card_type']
-        
-        try:
-            front_data = json.loads(self.current_card['front'])
-        except (json.JSONDecodeError, TypeError):
-            front_data = {'text': self.current_card['front']}
-        
-        self._setup_card_ui(front_data)
+        self._setup_card_ui(self.current_card)
+        # Пока пользователь думает над этой карточкой, готовим медиа следующих
+        self.prefetcher.prefetch(self.all_cards)
 
         if card_type == 'direct_recognition':
             self.ids.action_button.text = self.app.translator.t('show_answer_button')
@@ -53,9 +74,16 @@ class TrainingScreen(MDScreen):
             progress = (self._session_total - len(self.all_cards)) / self._session_total * 100
             self.ids.progress_bar.value = progress
     
-    def _setup_card_ui(self, data):
-        self.ids.question_label.text = data.get('text', '')
-        image_path = data.get('image'); self.ids.card_image.source = image_path if image_path else 'assets/tmp/placeholder.png'; self.ids.card_image.reload()
+    def _setup_card_ui(self, card):
+        self.ids.question_label.text = card['text'] or ''
+        # Миниатюра вместо полноразмерной картинки; reload() не нужен - файлы с адресацией
+        # по содержимому не меняются, и текстура берется из кэша Kivy
+        image_path = display_path(card['image'])
+        if texture := self.prefetcher.texture(image_path):
+            # Текстура уже предзагружена - ставим ее напрямую, без чтения файла
+            self.ids.card_image.source = ''; self.ids.card_image.texture = texture
+        else:
+            self.ids.card_image.source = image_path or 'assets/tmp/placeholder.png'
     
     def handle_main_action(self):
         if self._current_mode == 'show_answer': self.show_correct_answer()
@@ -67,7 +95,7 @@ class TrainingScreen(MDScreen):
         ДАЕТ ВИЗУАЛЬНЫЙ И ЗВУКОВОЙ ОТКЛИК.
         """
         user_answer = self.ids.answer_input.text.strip()
-        correct_answer = self.current_card['back']
+        correct_answer = self.current_card['answer']
         
         if user_answer.lower() == correct_answer.lower():
             # Правильно!
@@ -75,8 +103,8 @@ class TrainingScreen(MDScreen):
             self.ids.answer_input.icon_right_color_normal = self.app.theme_cls.primary_color
             # Меняем цвет фона поля ввода на слегка зеленый
             self.ids.answer_input.fill_color_normal = (0.2, 0.8, 0.2, 0.2) 
-            # Загружаем и проигрываем звук успеха
-            sound = SoundLoader.load('assets/tmp/correct.mp3')
+            # Звук успеха из заранее загруженного банка
+            sound_bank.play('correct')
 
         else:
             # Неправильно!
@@ -86,24 +114,19 @@ class TrainingScreen(MDScreen):
             self.ids.answer_input.fill_color_normal = (0.8, 0.2, 0.2, 0.2)
             # Показываем правильный ответ
             self.ids.correct_answer_label.text = self.app.translator.t('correct_answer_is', answer=correct_answer)
-            # Загружаем и проигрываем звук ошибки
-            sound = SoundLoader.load('assets/tmp/wrong.mp3')
-        
-        if sound:
-            sound.play()
+            # Звук ошибки из заранее загруженного банка
+            sound_bank.play('wrong')
             
         self.ids.answer_input.disabled = True # Блокируем поле после ответа
         self._show_srs_buttons(True)
     
     def show_correct_answer(self):
-        self.ids.correct_answer_label.text = self.current_card['back']
+        self.ids.correct_answer_label.text = self.current_card['answer']
         self._show_srs_buttons(True)
     
     def play_audio(self):
         try:
-            front_data = json.loads(self.current_card['front'])
-            if audio_path := front_data.get('audio'):
-                if sound := SoundLoader.load(audio_path): sound.play()
+            if sound := self.prefetcher.sound(self.current_card['audio']): sound.play()
         except: pass
     
     def evaluate_answer(self, quality: str):
@@ -122,16 +145,17 @@ class TrainingScreen(MDScreen):
         
         # 2. Если ответ "Хорошо" или "Легко", мы обновляем SRS в БД.
         else:
+            # Модуль к этому времени уже загружен фоновым импортом; если еще нет - дождемся его
+            from core.srs import calculate_next_due_date
             srs_result = calculate_next_due_date(
                 repetitions=card['repetitions'],
                 interval=card['interval'],
                 ease_factor=card['ease_factor'],
                 quality=quality
             )
-            app.db_manager.update_card_srs(
-                card_id=card['id'],
-                **srs_result
-            )
+            # В памяти карточка обновляется сразу, а в БД ответ попадет при следующем сбросе буфера
+            card.update(srs_result)
+            app.review_buffer.record(card['id'], srs_result)
         
         # 3. В любом случае, переходим к следующей карточке.
         self.show_next_card()
@@ -141,6 +165,7 @@ class TrainingScreen(MDScreen):
         self.ids.question_label.text = self.app.translator.t('training_complete')
         self.ids.card_image.source = ''
         self.ids.action_button.disabled = True
+        self.app.review_buffer.flush()
         Clock.schedule_once(lambda dt: setattr(self.manager, 'current', 'deck_list'), 2)
 
     def _reset_ui(self):
@@ -0,0 +1,49 @@
+# Файл: tests/test_audio_queue.py
+import asyncio
+from core import audio_store
+from core.audio_store import AudioJobQueue
+from core.database import DatabaseManager
+
+
+class SlowStore:
+    """Хранилище-заглушка: "синтез" длится delay секунд и возвращает путь по тексту."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def key_for(self, text, lang, slow=False):
+        return f"{lang}:{text}:{slow}"
+
+    async def synthesize(self, text, lang, slow=False):
+        await asyncio.sleep(self.delay)
+        return f"audio/{lang}-{text}.mp3"
+
+
+def test_shutdown_drains_started_jobs():
+    queue, results = AudioJobQueue(SlowStore(0.2)), []
+    queue.submit('olá', 'pt', callback=results.append)
+    queue.shutdown(timeout=5)
+    assert results == ['audio/pt-olá.mp3']
+
+
+def test_shutdown_cancels_jobs_after_timeout():
+    queue, results = AudioJobQueue(SlowStore(60)), []
+    future = queue.submit('olá', 'pt', callback=results.append)
+    queue.shutdown(timeout=0.1)
+    assert future.cancelled() and results == [None]
+
+
+def test_backfill_fills_concepts_without_audio(tmp_path, monkeypatch):
+    queue = AudioJobQueue(SlowStore(0))
+    monkeypatch.setattr(audio_store, 'audio_jobs', queue)
+    db = DatabaseManager(str(tmp_path / 'test.db'))
+    deck_id = db.create_deck('Main', 'pt')
+    voiced, silent = db.create_concepts_bulk(deck_id, [{'keyword': 'bom dia', 'translation': '-', 'audio_path': 'audio/ready.mp3'},
+                                                       {'keyword': 'boa noite', 'translation': '-'}])
+    assert audio_store.backfill_missing_audio(db) == 1
+    queue.shutdown(timeout=5)
+    assert db.get_concepts_without_audio(10) == []
+    with db._pool.reader() as conn:
+        paths = dict(conn.execute("SELECT id, audio_path FROM concepts").fetchall())
+    assert paths == {voiced: 'audio/ready.mp3', silent: 'audio/pt-boa noite.mp3'}
+    db.close()
@@ -0,0 +1,36 @@
+# Файл: tests/test_bulk_import.py
+import asyncio
+import pytest
+
+# core.bulk_import тянет core.enrichment с клиентами Gemini, Pexels и googletrans
+for _module in ('google.generativeai', 'pexels_api', 'googletrans'):
+    pytest.importorskip(_module)
+
+from core import bulk_import
+from core.bulk_import import BulkImporter, Checkpoint
+from core.database import DatabaseManager
+
+EXAMPLES = [{'original': 'um <b>exemplo</b>', 'translation': 'пример'}]
+
+
+async def fake_enrich(keyword, sentence, lang_code, target_lang):
+    # Для 'sem' сервис перевода не ответил
+    return {'keyword': keyword, 'translation': None if keyword == 'sem' else f'{keyword}-ru',
+            'full_sentence_translation': None, 'examples': EXAMPLES, 'image_path': None, 'audio_path': None}
+
+
+async def noop(*args, **kwargs):
+    return {}
+
+
+def test_row_without_translation_is_failed_and_not_checkpointed(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_import, 'enrich_phrase', fake_enrich)
+    monkeypatch.setattr(bulk_import, 'generate_examples_batch', noop)
+    monkeypatch.setattr(bulk_import, 'get_translations', noop)
+    db = DatabaseManager(str(tmp_path / 'test.db'))
+    checkpoint = Checkpoint(tmp_path / 'words.txt.checkpoint')
+    importer = BulkImporter(db, db.create_deck('Main', 'pt'), 'pt', 'ru', with_audio=False, checkpoint=checkpoint)
+    stats = asyncio.run(importer.run([('casa', ''), ('sem', ''), ('praia', '')]))
+    assert stats['failed'] == 1 and stats['enriched'] == 2
+    assert Checkpoint(checkpoint.path).done == {0, 2}
+    db.close()
@@ -0,0 +1,49 @@
+# Файл: tests/test_database.py
+import sqlite3
+from core import database
+from core.database import DatabaseManager
+from core import migrations
+
+
+def test_bulk_save_rejects_normalized_duplicates(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'))
+    deck_id, other = db.create_deck('Main', 'pt'), db.create_deck('Other', 'pt')
+    assert isinstance(db.create_concepts_bulk(deck_id, [{'keyword': 'Olá, mundo!', 'translation': 'привет, мир'}])[0], int)
+    items = [{'keyword': k, 'translation': '-'} for k in ('olá   mundo', 'OLÁ MUNDO.', 'ola mundo', 'Bom dia', 'bom dia!')]
+    statuses = db.create_concepts_bulk(deck_id, items)
+    # Регистр, пунктуация и пробелы не важны, диакритика важна; повтор внутри пачки - тоже дубликат
+    assert statuses[:2] == ['duplicate', 'duplicate'] and statuses[4] == 'duplicate'
+    assert isinstance(statuses[2], int) and isinstance(statuses[3], int)
+    # В другой колоде та же фраза не дубликат
+    assert isinstance(db.create_concepts_bulk(other, [{'keyword': 'olá mundo', 'translation': '-'}])[0], int)
+    db.close()
+
+
+def test_migration_backfills_normalized_keywords(tmp_path, monkeypatch):
+    conn = sqlite3.connect(tmp_path / 'old.db')
+    # База на версии до norm_keyword с уже сохраненным концептом
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS[:5])
+    assert migrations.migrate(conn) == 5
+    conn.execute("INSERT INTO decks (id, name) VALUES (1, 'Main')")
+    conn.execute("INSERT INTO concepts (deck_id, keyword) VALUES (1, '  Olá,  Mundo! ')")
+    conn.commit()
+    monkeypatch.undo()
+    assert migrations.migrate(conn) == migrations.SCHEMA_VERSION
+    assert conn.execute("SELECT norm_keyword FROM concepts").fetchone()[0] == 'olá mundo'
+    conn.close()
+
+
+def test_search_puts_whole_keyword_and_keyword_hits_first(tmp_path, monkeypatch):
+    # Маленький предел кандидатов: точное совпадение - самый старый концепт среди сотни совпадений
+    monkeypatch.setattr(database, 'SEARCH_RANK_CANDIDATES', 10)
+    db = DatabaseManager(str(tmp_path / 'test.db'))
+    deck_id = db.create_deck('Main', 'pt')
+    db.create_concepts_bulk(deck_id, [{'keyword': 'Casa!', 'translation': 'дом'}])
+    db.create_concepts_bulk(deck_id, [{'keyword': f'palavra {i}', 'translation': f'casa {i}'} for i in range(50)])
+    db.create_concepts_bulk(deck_id, [{'keyword': f'casa grande {i}', 'translation': 'большой дом'} for i in range(5)])
+    hits = db.search('casa', limit=8)
+    assert hits[0]['keyword'] == 'Casa!'
+    assert all(h['keyword'].startswith('casa grande') for h in hits[1:6])
+    assert all(h['keyword'].startswith('palavra') for h in hits[6:])
+    assert db.search('casa', deck_id=deck_id + 1) == []
+    db.close()
@@ -0,0 +1,116 @@
+# Файл: tests/test_image_download.py
+import asyncio, hashlib
+import pytest
+
+# core.enrichment тянет за собой клиентов Gemini, Pexels и googletrans
+for _module in ('google.generativeai', 'pexels_api', 'googletrans'):
+    pytest.importorskip(_module)
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from core import enrichment
+from core.cache import PersistentCache
+from core.image_store import ImageStore, PARTIAL_SUFFIX
+from core.scheduler import ServiceScheduler
+
+BODY = b'\x89PNG' + bytes(range(256)) * 64
+ETAG = '"v1"'
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ImageStore(tmp_path / 'images', tmp_path / 'thumbs')
+    store.root.mkdir()
+    monkeypatch.setattr(enrichment, 'image_store', store)
+    monkeypatch.setattr(enrichment, 'http_validators', PersistentCache('http_validators', db_name=str(tmp_path / 'cache.db')))
+    return store
+
+
+def make_app(hits: dict) -> web.Application:
+    async def photo(request):
+        hits['photo'] = hits.get('photo', 0) + 1
+        if request.headers.get('If-None-Match') == ETAG: return web.Response(status=304)
+        return web.Response(body=BODY, headers={'ETag': ETAG})
+
+    async def huge(request):
+        # Без Content-Length: размер выясняется только по ходу чтения
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for _ in range(8): await response.write(BODY)
+        return response
+
+    async def flaky(request):
+        hits['flaky'] = hits.get('flaky', 0) + 1
+        if hits['flaky'] < 3: return web.Response(status=503)
+        return web.Response(body=BODY)
+
+    async def not_modified(request):
+        return web.Response(status=304)
+
+    app = web.Application()
+    app.router.add_get('/photo.png', photo)
+    app.router.add_get('/huge.jpg', huge)
+    app.router.add_get('/flaky.jpg', flaky)
+    app.router.add_get('/not_modified.jpg', not_modified)
+    return app
+
+
+def run(scenario, hits: dict):
+    async def main():
+        async with TestServer(make_app(hits)) as server:
+            try: return await scenario(lambda path: str(server.make_url(path)))
+            finally: await enrichment.shutdown_enrichment()
+    return asyncio.run(main())
+
+
+def leftovers(store: ImageStore) -> list:
+    return list(store.root.glob(f'*{PARTIAL_SUFFIX}'))
+
+
+def test_streamed_download_is_committed_by_hash(store):
+    path = run(lambda url: enrichment.download_image(url('/photo.png')), {})
+    assert path == str(store.path_for(hashlib.sha256(BODY).hexdigest(), '.png'))
+    assert store.path_for(hashlib.sha256(BODY).hexdigest(), '.png').read_bytes() == BODY
+    assert not leftovers(store)
+
+
+def test_not_modified_reuses_stored_file(store):
+    hits = {}
+    async def scenario(url):
+        first = await enrichment.download_image(url('/photo.png'))
+        second = await enrichment.download_image(url('/photo.png'))
+        return first, second
+    first, second = run(scenario, hits)
+    assert first == second and hits['photo'] == 2
+    assert [p.name for p in store.root.iterdir()] == [f'{hashlib.sha256(BODY).hexdigest()}.png']
+
+
+def test_unconditional_304_is_not_a_hit(store):
+    assert run(lambda url: enrichment.download_image(url('/not_modified.jpg')), {}) is None
+
+
+def test_oversized_download_removes_partial_file(store, monkeypatch):
+    monkeypatch.setattr(enrichment, 'MAX_IMAGE_BYTES', len(BODY) * 2)
+    with pytest.raises(ValueError): run(lambda url: enrichment.download_image(url('/huge.jpg')), {})
+    assert list(store.root.iterdir()) == []
+
+
+def test_retryable_status_is_retried(store):
+    hits = {}
+    scheduler = ServiceScheduler({'images': {'rate': 1000, 'burst': 1000, 'max_retries': 2, 'base_delay': 0, 'max_delay': 0}})
+    path = run(lambda url: scheduler.call('images', lambda: enrichment.download_image(url('/flaky.jpg'))), hits)
+    assert hits['flaky'] == 3
+    assert path == str(store.path_for(hashlib.sha256(BODY).hexdigest(), '.jpg'))
+    assert not leftovers(store)
+
+
+def test_entry_for_deleted_file_is_dropped(store):
+    hits = {}
+    async def scenario(url):
+        first = await enrichment.download_image(url('/photo.png'))
+        # Сборка мусора удалила файл: запрос снова безусловный, картинка скачивается заново
+        store.path_for(hashlib.sha256(BODY).hexdigest(), '.png').unlink()
+        return first, await enrichment.download_image(url('/photo.png'))
+    first, second = run(scenario, hits)
+    assert first == second and hits['photo'] == 2
+    assert store.path_for(hashlib.sha256(BODY).hexdigest(), '.png').read_bytes() == BODY
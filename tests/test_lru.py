@@ -0,0 +1,35 @@
+# Файл: tests/test_lru.py
+from core.lru import LRUCache
+
+
+class Clip:
+    def __init__(self, name): self.name, self.unloaded = name, False
+    def unload(self): self.unloaded = True
+
+
+def make_cache(max_items=2) -> LRUCache:
+    return LRUCache(max_items, on_evict=lambda clip: clip.unload())
+
+
+def test_put_evicts_least_recently_used():
+    cache, a, b, c = make_cache(), Clip('a'), Clip('b'), Clip('c')
+    cache.put('a', a); cache.put('b', b)
+    cache.get('a')
+    cache.put('c', c)
+    assert b.unloaded and not a.unloaded and 'b' not in cache and cache.evictions == 1
+
+
+def test_put_releases_replaced_value():
+    cache, old, new = make_cache(), Clip('old'), Clip('new')
+    cache.put('a', old); cache.put('a', new)
+    assert old.unloaded and not new.unloaded and cache.get('a') is new
+    # Повторный put того же объекта его не выгружает
+    cache.put('a', new)
+    assert not new.unloaded
+
+
+def test_add_keeps_cached_value_and_releases_duplicate():
+    cache, playing, duplicate = make_cache(), Clip('playing'), Clip('duplicate')
+    assert cache.add('a', playing) is playing
+    assert cache.add('a', duplicate) is playing
+    assert duplicate.unloaded and not playing.unloaded and len(cache) == 1
@@ -0,0 +1,43 @@
+# Файл: tests/test_review_buffer.py
+from concurrent.futures import Future
+from core.review_buffer import ReviewBuffer
+
+
+class FakeDB:
+    """Писатель БД, пачки которого завершаются вручную: submitted - [(updates, future), ...]."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit_srs_updates(self, updates, dedupe_history=False):
+        future = Future(); self.submitted.append((updates, future))
+        return future
+
+
+def answer() -> dict:
+    return {'repetitions': 1, 'interval': 1, 'ease_factor': 2.5, 'due_date': '2026-01-01T00:00:00Z'}
+
+
+def test_answers_recorded_during_write_follow_the_batch(tmp_path):
+    db = FakeDB()
+    buffer = ReviewBuffer(db, tmp_path / 'journal.jsonl', flush_max=100)
+    buffer.record(1, answer())
+    assert buffer.flush() is not None
+    # Пачка еще пишется: новый ответ остается в буфере
+    buffer.record(2, answer())
+    assert buffer.flush() is None and len(db.submitted) == 1
+    db.submitted[0][1].set_result(None)
+    # После фиксации первой пачки оставшееся уходит само, без периодического сброса
+    assert len(db.submitted) == 2 and [u['card_id'] for u in db.submitted[1][0]] == [2]
+    db.submitted[1][1].set_result(None)
+    assert buffer.pending() == 0 and not (tmp_path / 'journal.jsonl').exists()
+
+
+def test_failed_batch_is_kept_and_not_resubmitted_immediately(tmp_path):
+    db = FakeDB()
+    buffer = ReviewBuffer(db, tmp_path / 'journal.jsonl', flush_max=100)
+    buffer.record(1, answer()); buffer.flush()
+    buffer.record(2, answer())
+    db.submitted[0][1].set_exception(RuntimeError('disk full'))
+    assert len(db.submitted) == 1 and buffer.pending() == 2
+    assert [u['card_id'] for u in buffer._pending] == [1, 2]
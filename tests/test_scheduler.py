@@ -0,0 +1,54 @@
+# Файл: tests/test_scheduler.py
+import asyncio
+import pytest
+from core.scheduler import ServiceScheduler, ServiceStatusError, CircuitOpenError
+
+
+def make_scheduler(**overrides) -> ServiceScheduler:
+    # Без задержек: порог в одну ошибку, полуоткрытое состояние сразу же
+    params = dict(rate=1000, burst=1000, max_retries=0, base_delay=0, max_delay=0, failure_threshold=1, reset_timeout=0)
+    return ServiceScheduler({'svc': {**params, **overrides}})
+
+
+async def fail(exc):
+    raise exc
+
+
+async def ok():
+    return 'ok'
+
+
+def test_non_retryable_probe_closes_breaker():
+    scheduler = make_scheduler()
+    async def scenario():
+        with pytest.raises(ServiceStatusError): await scheduler.call('svc', lambda: fail(ServiceStatusError(503)))
+        # Пробный запрос получил ответ, пусть и ошибочный: сервис доступен
+        with pytest.raises(ValueError): await scheduler.call('svc', lambda: fail(ValueError('bad payload')))
+        assert scheduler.metrics()['svc']['circuit'] == 'closed'
+        assert await scheduler.call('svc', ok) == 'ok'
+    asyncio.run(scenario())
+
+
+def test_cancelled_probe_is_released():
+    scheduler = make_scheduler()
+    async def hang():
+        await asyncio.sleep(3600)
+    async def scenario():
+        with pytest.raises(ServiceStatusError): await scheduler.call('svc', lambda: fail(ServiceStatusError(503)))
+        probe = asyncio.create_task(scheduler.call('svc', hang))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError): await probe
+        # Отмененная проба не держит предохранитель: следующий вызов снова пробует
+        assert await scheduler.call('svc', ok) == 'ok'
+        assert scheduler.metrics()['svc']['circuit'] == 'closed'
+    asyncio.run(scenario())
+
+
+def test_open_breaker_rejects_until_timeout():
+    scheduler = make_scheduler(reset_timeout=3600)
+    async def scenario():
+        with pytest.raises(ServiceStatusError): await scheduler.call('svc', lambda: fail(ServiceStatusError(503)))
+        with pytest.raises(CircuitOpenError): await scheduler.call('svc', ok)
+        assert scheduler.metrics()['svc']['circuit'] == 'open'
+    asyncio.run(scenario())